@@ -3,20 +3,393 @@ import requests
 import os
 import urllib.parse
 import random
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from requests.adapters import HTTPAdapter
+import metrics
+
+
+class EnrichmentCache:
+    """
+    Two-tier cache for upstream API responses, keyed by (source, place name).
+    1. Hot entries are kept in an in-process LRU.
+    2. Everything else is persisted to SQLite so restarts and other workers reuse it.
+    Each source has its own TTL; failures are cached for a shorter negative TTL
+    so a broken lookup does not hammer the upstream on every page view.
+    """
+    DEFAULT_TTLS = {
+        "location": 30 * 24 * 3600,    # Coordinates practically never change
+        "description": 7 * 24 * 3600,
+        "images": 24 * 3600,
+        "hotels": 24 * 3600,
+        "place": 7 * 24 * 3600,        # Assembled details; EnrichmentQueue refreshes them sooner
+    }
+    DEFAULT_TTL = 24 * 3600
+    NEGATIVE_TTL = 15 * 60
+
+    def __init__(self, db_path="enrichment_cache.db", max_memory_items=1024, ttls=None, negative_ttl=None):
+        self.db_path = db_path
+        self.max_memory_items = max_memory_items
+        self.ttls = dict(self.DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.negative_ttl = self.NEGATIVE_TTL if negative_ttl is None else negative_ttl
+
+        self._memory = OrderedDict()  # (source, key) -> (value, negative, expires_at)
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "negative_hits": 0, "misses": 0, "sets": 0}
+
+        self._db = None
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+                # WAL lets several gunicorn workers read while one writes
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS cache ("
+                    "source TEXT NOT NULL, key TEXT NOT NULL, value TEXT, "
+                    "negative INTEGER NOT NULL DEFAULT 0, expires_at REAL NOT NULL, "
+                    "PRIMARY KEY (source, key))"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Enrichment cache disk store unavailable ({e}), using memory only.")
+                self._db = None
+
+    @staticmethod
+    def _normalize(key):
+        return " ".join(str(key).lower().split())
+
+    def _remember(self, ck, entry):
+        # Caller must hold the lock
+        self._memory[ck] = entry
+        self._memory.move_to_end(ck)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, source, key):
+        """
+        Returns (value, negative) for a fresh entry, or None on a miss.
+        """
+        ck = (source, self._normalize(key))
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(ck)
+            if entry is not None:
+                if entry[2] > now:
+                    self._memory.move_to_end(ck)
+                    self.counters["negative_hits" if entry[1] else "memory_hits"] += 1
+                    return entry[0], entry[1]
+                del self._memory[ck]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, negative, expires_at FROM cache WHERE source = ? AND key = ?", ck
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    print(f"Enrichment cache read failed: {e}")
+                    row = None
+                if row and row[2] > now:
+                    value = json.loads(row[0]) if row[0] is not None else None
+                    negative = bool(row[1])
+                    self._remember(ck, (value, negative, row[2]))
+                    self.counters["negative_hits" if negative else "disk_hits"] += 1
+                    return value, negative
+
+            self.counters["misses"] += 1
+        return None
+
+    def set(self, source, key, value, negative=False, ttl=None):
+        """
+        Stores a value (or a negative marker for a failed lookup) with the source TTL.
+        """
+        if ttl is None:
+            ttl = self.negative_ttl if negative else self.ttls.get(source, self.DEFAULT_TTL)
+        ck = (source, self._normalize(key))
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._remember(ck, (value, negative, expires_at))
+            self.counters["sets"] += 1
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO cache (source, key, value, negative, expires_at) VALUES (?, ?, ?, ?, ?)",
+                        (ck[0], ck[1], None if negative else json.dumps(value), int(negative), expires_at)
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"Enrichment cache write failed: {e}")
+
+    def purge_expired(self):
+        """
+        Drops expired rows from both tiers. Returns the number of disk rows removed.
+        """
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for ck in [ck for ck, entry in self._memory.items() if entry[2] <= now]:
+                del self._memory[ck]
+            if self._db is not None:
+                try:
+                    removed = self._db.execute("DELETE FROM cache WHERE expires_at <= ?", (now,)).rowcount
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"Enrichment cache purge failed: {e}")
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM cache")
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"Enrichment cache clear failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["memory_items"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["negative_hits"] + stats["misses"]
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. acquire() blocks until a token is available,
+    so callers are smoothed to `rate` requests per second with bursts up to `capacity`.
+    """
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HTTPClient:
+    """
+    Shared HTTP layer for all upstream calls:
+    1. One pooled requests.Session, so connections (TCP+TLS) are reused.
+    2. Connect/read timeouts on every request.
+    3. Retries with jittered exponential backoff on connection errors, 429 and 5xx.
+    4. Per-host token-bucket rate limiting (Nominatim's policy is 1 req/s);
+       `rate_limits` overrides or adds hosts, a rate of 0 removes the limit.
+    5. Per-host request, error, retry and latency counters, also exported on /metrics.
+    """
+    DEFAULT_RATE_LIMITS = {
+        "nominatim.openstreetmap.org": 1.0,
+    }
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, connect_timeout=3.05, read_timeout=10.0, max_retries=2, backoff_base=0.5,
+                 rate_limits=None, pool_size=20):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        limits = dict(self.DEFAULT_RATE_LIMITS)
+        if rate_limits:
+            limits.update(rate_limits)
+        self._buckets = {host: TokenBucket(rate) for host, rate in limits.items() if rate}
+
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def _record(self, host, latency, error=False, retry=False, status=None):
+        if retry:
+            metrics.UPSTREAM_RETRIES.inc(host=host)
+        else:
+            metrics.UPSTREAM_SECONDS.observe(latency, host=host, status=status or "error")
+        with self._stats_lock:
+            stats = self._stats.setdefault(host, {
+                "requests": 0, "errors": 0, "retries": 0,
+                "total_latency": 0.0, "max_latency": 0.0
+            })
+            if retry:
+                stats["retries"] += 1
+                return
+            stats["requests"] += 1
+            stats["total_latency"] += latency
+            stats["max_latency"] = max(stats["max_latency"], latency)
+            if error:
+                stats["errors"] += 1
+
+    def get(self, url, **kwargs):
+        """
+        GET with pooling, timeouts, rate limiting and retries.
+        Returns the final response (which may still be an error status) or
+        raises the last connection/timeout error once retries are exhausted.
+        """
+        host = urllib.parse.urlsplit(url).hostname or ""
+        kwargs.setdefault("timeout", self.timeout)
+        bucket = self._buckets.get(host)
+
+        for attempt in range(self.max_retries + 1):
+            if bucket:
+                bucket.acquire()
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(host, time.monotonic() - started, error=True)
+                if attempt == self.max_retries:
+                    raise
+            else:
+                failed = response.status_code >= 400
+                self._record(host, time.monotonic() - started, error=failed, status=response.status_code)
+                if response.status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+            self._record(host, 0.0, retry=True)
+            # Full jitter: sleep somewhere in [0, base * 2^attempt]
+            time.sleep(random.uniform(0, self.backoff_base * (2 ** attempt)))
+
+    def stats(self):
+        with self._stats_lock:
+            snapshot = {host: dict(stats) for host, stats in self._stats.items()}
+        for stats in snapshot.values():
+            stats["avg_latency"] = round(stats["total_latency"] / stats["requests"], 4) if stats["requests"] else 0.0
+        return snapshot
+
+
+def parse_rate_limits(spec):
+    """
+    Parses "host=rate,host=rate" (requests per second; 0 disables the host's
+    limit) into a dict for HTTPClient's rate_limits. Raises ValueError on bad input.
+    """
+    limits = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        host, sep, rate = item.partition("=")
+        try:
+            rate = float(rate)
+        except ValueError:
+            rate = -1.0
+        if not sep or not host.strip() or not rate >= 0:
+            raise ValueError(f"Bad rate limit '{item.strip()}', expected host=requests_per_second")
+        limits[host.strip().lower()] = rate
+    return limits
+
+
+def make_http_client(rate_limits=None):
+    """
+    HTTPClient configured from the environment. Per-host limits come from
+    DEFAULT_RATE_LIMITS, then TRIPGENIX_RATE_LIMITS (see parse_rate_limits),
+    then `rate_limits`.
+    """
+    limits = parse_rate_limits(os.environ.get('TRIPGENIX_RATE_LIMITS', ''))
+    limits.update(rate_limits or {})
+    return HTTPClient(
+        connect_timeout=float(os.environ.get('TRIPGENIX_CONNECT_TIMEOUT', 3.05)),
+        read_timeout=float(os.environ.get('TRIPGENIX_READ_TIMEOUT', 10.0)),
+        max_retries=int(os.environ.get('TRIPGENIX_MAX_RETRIES', 2)),
+        rate_limits=limits,
+    )
+
+
+_default_http_client = None
+_default_http_client_lock = threading.Lock()
+
+
+def get_default_http_client():
+    """
+    Process-wide HTTPClient, so every manager instance shares one connection pool
+    and one set of per-host rate limiters.
+    """
+    global _default_http_client
+    with _default_http_client_lock:
+        if _default_http_client is None:
+            _default_http_client = make_http_client()
+        return _default_http_client
+
+
+def reset_default_http_client():
+    """
+    Drops the process-wide client so the next caller builds a fresh one; used in
+    forked workers, which must not share the parent's pooled sockets.
+    """
+    global _default_http_client, _default_http_client_lock
+    _default_http_client = None
+    _default_http_client_lock = threading.Lock()
+
 
 class TripGenixAPIManager:
-    def __init__(self):
+    def __init__(self, cache=None, http=None):
         self.unsplash_access_key = os.environ.get('UNSPLASH_KEY')
         self.user_agent = "TripGenix_AI_Agent/1.0" # OSM requires a user agent
+        # Upstream base URLs; overridable so benchmarks can point at a local stub
+        self.nominatim_url = os.environ.get('TRIPGENIX_NOMINATIM_URL', "https://nominatim.openstreetmap.org")
+        self.wikipedia_url = os.environ.get('TRIPGENIX_WIKIPEDIA_URL', "https://en.wikipedia.org")
+        self.unsplash_url = os.environ.get('TRIPGENIX_UNSPLASH_URL', "https://api.unsplash.com")
+        if cache is None:
+            cache = EnrichmentCache(db_path=os.environ.get('TRIPGENIX_CACHE_PATH', "enrichment_cache.db"))
+        self.cache = cache
+        self.http = http or get_default_http_client()
+        # Bounded pool shared by concurrent enrichment; created on first use
+        self.max_workers = int(os.environ.get('TRIPGENIX_ENRICH_WORKERS', 8))
+        self.enrich_timeout = float(os.environ.get('TRIPGENIX_ENRICH_TIMEOUT', 8.0))
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tripgenix-enrich")
+            return self._executor
+
+    def _cached(self, source, key, fetch):
+        """
+        Serves a lookup from the enrichment cache, calling `fetch` on a miss.
+        Empty results are stored as negative entries and returned as None.
+        """
+        entry = self.cache.get(source, key)
+        if entry is not None:
+            value, negative = entry
+            return None if negative else value
+
+        value = fetch()
+        if value:
+            self.cache.set(source, key, value)
+            return value
+        self.cache.set(source, key, None, negative=True)
+        return None
 
     def get_location_data(self, place_name):
         """
         Fetches Lat, Lon, Display Name, Region from OpenStreetMap (Nominatim).
         """
+        return self._cached("location", place_name, lambda: self._fetch_location_data(place_name))
+
+    def _fetch_location_data(self, place_name):
         try:
-            url = f"https://nominatim.openstreetmap.org/search?q={urllib.parse.quote(place_name)}&format=json&limit=1"
+            url = f"{self.nominatim_url}/search?q={urllib.parse.quote(place_name)}&format=json&limit=1"
             headers = {'User-Agent': self.user_agent}
-            response = requests.get(url, headers=headers)
+            response = self.http.get(url, headers=headers)
             if response.status_code == 200 and response.json():
                 data = response.json()[0]
                 return {
@@ -34,10 +407,16 @@ class TripGenixAPIManager:
         """
         Fetches description from Wikipedia.
         """
+        data = self._cached("description", place_name, lambda: self._fetch_description(place_name))
+        if data:
+            return data
+        return {"title": place_name, "extract": f"Discover the beauty of {place_name}."}
+
+    def _fetch_description(self, place_name):
         try:
             # First try direct search
-            url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{urllib.parse.quote(place_name)}"
-            response = requests.get(url)
+            url = f"{self.wikipedia_url}/api/rest_v1/page/summary/{urllib.parse.quote(place_name)}"
+            response = self.http.get(url)
             if response.status_code == 200:
                 data = response.json()
                 if 'extract' in data:
@@ -47,7 +426,7 @@ class TripGenixAPIManager:
                     }
         except Exception as e:
             print(f"Error fetching description for {place_name}: {e}")
-        return {"title": place_name, "extract": f"Discover the beauty of {place_name}."}
+        return None
 
     def get_images(self, place_name):
         """
@@ -59,9 +438,17 @@ class TripGenixAPIManager:
             # Generate 10 unique seeded placeholders for fallback
             return [f"https://picsum.photos/seed/{place_name.replace(' ', '')}{i}/800/600" for i in range(10)]
 
+        images = self._cached("images", place_name, lambda: self._fetch_images(place_name))
+        if images:
+            return images
+
+        # Fallback if API fails or no images
+        return [f"https://source.unsplash.com/800x600/?{urllib.parse.quote(place_name)}"]
+
+    def _fetch_images(self, place_name):
         try:
-            url = f"https://api.unsplash.com/search/photos?query={urllib.parse.quote(place_name)}&client_id={self.unsplash_access_key}&per_page=10&orientation=landscape"
-            response = requests.get(url)
+            url = f"{self.unsplash_url}/search/photos?query={urllib.parse.quote(place_name)}&client_id={self.unsplash_access_key}&per_page=10&orientation=landscape"
+            response = self.http.get(url)
             if response.status_code == 200:
                 data = response.json()
                 results = data.get('results', [])
@@ -69,9 +456,7 @@ class TripGenixAPIManager:
                     return [img['urls']['regular'] for img in results]
         except Exception as e:
             print(f"Error fetching images for {place_name}: {e}")
-        
-        # Fallback if API fails or no images
-        return [f"https://source.unsplash.com/800x600/?{urllib.parse.quote(place_name)}"]
+        return None
 
     def generate_map_link(self, place_name):
         """
@@ -79,10 +464,17 @@ class TripGenixAPIManager:
         """
         return f"https://www.google.com/maps/search/?api=1&query={urllib.parse.quote(place_name)}"
 
+    # Half-width of the hotel search box, in degrees (~11 km)
+    HOTEL_SEARCH_DEGREES = 0.1
+
     def get_hotels(self, place_name, lat=None, lon=None):
         """
         Fetches real hotels near the place using OSM/Nominatim.
         """
+        # Copy so callers can sort/slice without mutating the cached entry
+        return list(self._cached("hotels", place_name, lambda: self._fetch_hotels(place_name, lat, lon)) or [])
+
+    def _fetch_hotels(self, place_name, lat=None, lon=None):
         try:
             # If lat/lon not provided, fetch them first
             if not lat or not lon:
@@ -92,19 +484,24 @@ class TripGenixAPIManager:
                 else:
                     return [] # Cannot search without location
 
-            # Nominatim search for hotels near coordinates
-            # We use a structured query or just 'hotels in [place_name]' if place name is good
-            # But searching near lat/lon is better.
-            # Nominatim doesn't have a strict 'near' parameter for search endpoint easily exposed, 
-            # but we can try searching "hotels near [Place Name]" 
-            
-            url = f"https://nominatim.openstreetmap.org/search?q=hotels+in+{urllib.parse.quote(place_name)}&format=json&limit=10&addressdetails=1"
+            # Nominatim search for hotels near coordinates: the "hotel" special
+            # phrase bounded to a box of HOTEL_SEARCH_DEGREES around the place
+            lat, lon = float(lat), float(lon)
+            d = self.HOTEL_SEARCH_DEGREES
+            url = (f"{self.nominatim_url}/search?q=hotel&format=json&limit=10&addressdetails=1"
+                   f"&viewbox={lon - d},{lat + d},{lon + d},{lat - d}&bounded=1")
             headers = {'User-Agent': self.user_agent}
-            response = requests.get(url, headers=headers)
-            
+            response = self.http.get(url, headers=headers)
+            results = response.json() if response.status_code == 200 else []
+
+            # Fall back to searching "hotels in [Place Name]" if the box is empty
+            if not results:
+                url = f"{self.nominatim_url}/search?q=hotels+in+{urllib.parse.quote(place_name)}&format=json&limit=10&addressdetails=1"
+                response = self.http.get(url, headers=headers)
+                results = response.json() if response.status_code == 200 else []
+
             hotels = []
-            if response.status_code == 200:
-                results = response.json()
+            if results:
                 for item in results:
                     # Filter for actual tourism/hotel items just in case
                     if item.get('class') == 'tourism' or 'hotel' in item.get('type', ''):
@@ -118,13 +515,7 @@ class TripGenixAPIManager:
                             "price": random.randint(1500, 15000) 
                         })
             
-            # Simple fallback if "hotels in X" returns nothing (common for smaller places in OSM)
-            if not hotels: 
-                # Retry with just "hotel" and viewbox? Too complex.
-                # Let's fallback to simulating if empty, but explicitly marked.
-                # Actually, ml_engine can handle the empty list fallback.
-                pass
-                
+            # Nothing found in either search: ml_engine falls back to mock hotels
             return hotels
 
         except Exception as e:
@@ -167,3 +558,168 @@ class TripGenixAPIManager:
             "images": images,
             "map": map_link
         }
+
+    def enrich_place_concurrent(self, place_name, include_hotels=True, timeout=None, location=None):
+        """
+        Same output as enrich_place, but issues the upstream calls in parallel:
+        1. Location, description and images are fetched concurrently.
+        2. Hotels reuse the fetched coordinates instead of geocoding a second time.
+           With a known `location` ({"lat", "lon"}, e.g. from the catalog) no
+           geocoding call is made at all and hotels start right away.
+        Every call shares one deadline; anything that misses it falls back to
+        the same defaults the sequential path uses, so partial results still render.
+        The result's "fallbacks" lists the parts that failed, timed out or
+        found nothing ("location", "description", "images", "hotels").
+        """
+        print(f"Enriching data for: {place_name} (concurrent)...")
+        timeout = self.enrich_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        executor = self._get_executor()
+        fallbacks = []
+
+        def wait(future, fallback, label):
+            try:
+                value = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                if value is not None:
+                    return value
+            except FutureTimeoutError:
+                print(f"Timed out fetching {label} for {place_name}, using fallback.")
+            except Exception as e:
+                print(f"Error fetching {label} for {place_name}: {e}")
+            fallbacks.append(label)
+            return fallback
+
+        location_future = None if location else executor.submit(self.get_location_data, place_name)
+        wiki_future = executor.submit(self._cached, "description", place_name,
+                                      lambda: self._fetch_description(place_name))
+        # Without an Unsplash key the seeded placeholders are the intended images
+        if self.unsplash_access_key:
+            images_future = executor.submit(self._cached, "images", place_name, lambda: self._fetch_images(place_name))
+        else:
+            images_future = executor.submit(self.get_images, place_name)
+
+        if location_future is not None:
+            location = wait(location_future, None, "location")
+
+        # Hotels need the coordinates, so they are chained after the location call
+        hotels_future = None
+        if include_hotels and location:
+            hotels_future = executor.submit(self.get_hotels, place_name, location['lat'], location['lon'])
+
+        if not location:
+            location = {"lat": 0.0, "lon": 0.0}
+        wiki_data = wait(wiki_future, {"title": place_name, "extract": f"Discover the beauty of {place_name}."}, "description")
+        images = wait(images_future, [f"https://source.unsplash.com/800x600/?{urllib.parse.quote(place_name)}"], "images")
+
+        result = {
+            "name": place_name,
+            "about": wiki_data['extract'],
+            "location": {
+                "lat": location['lat'],
+                "lon": location['lon']
+            },
+            "images": images,
+            "map": self.generate_map_link(place_name)
+        }
+        if include_hotels:
+            result["hotels"] = wait(hotels_future, [], "hotels") if hotels_future else []
+            # No hotels means the page shows mock ones, so it counts as a fallback too
+            if not result["hotels"] and "hotels" not in fallbacks:
+                fallbacks.append("hotels")
+        result["fallbacks"] = fallbacks
+        return result
+
+
+class EnrichmentQueue:
+    """
+    Background enrichment for place pages, so rendering never waits on upstream APIs.
+    1. get() answers from the "place" cache entry straight away: fresh data as-is,
+       data older than `fresh_ttl` as stale while a refresh runs in the background
+       (stale-while-revalidate), and nothing yet while the first fetch runs.
+       A fetch where some part fell back (upstream down or slow) is kept only
+       for the cache's short negative TTL and answered as "degraded", so the
+       next view after that refetches instead of serving placeholders for hours.
+    2. Refreshes run on a small worker pool; concurrent requests for the same
+       place share one in-flight fetch.
+    Entries live in the manager's EnrichmentCache, so workers and restarts reuse them.
+    """
+    SOURCE = "place"
+
+    def __init__(self, api_manager, workers=None, fresh_ttl=None):
+        self.api_manager = api_manager
+        self.workers = workers or int(os.environ.get('TRIPGENIX_ENRICH_QUEUE_WORKERS', 2))
+        self.fresh_ttl = fresh_ttl if fresh_ttl is not None else int(os.environ.get('TRIPGENIX_ENRICH_FRESH_TTL', 6 * 3600))
+        self._inflight = {}  # normalized place -> Future
+        self._lock = threading.Lock()
+        self._executor = None
+        self.counters = {"fresh": 0, "stale": 0, "degraded": 0, "pending": 0, "fetches": 0, "deduplicated": 0}
+
+    def _submit(self, place_name, location=None):
+        """
+        Schedules a refresh unless one is already running. Returns its future.
+        """
+        key = EnrichmentCache._normalize(place_name)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.counters["deduplicated"] += 1
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tripgenix-enrich-queue")
+            future = self._executor.submit(self._refresh, place_name, key, location)
+            self._inflight[key] = future
+            self.counters["fetches"] += 1
+            return future
+
+    def _refresh(self, place_name, key, location=None):
+        try:
+            data = self.api_manager.enrich_place_concurrent(place_name, include_hotels=True, location=location)
+            cache = self.api_manager.cache
+            cache.set(self.SOURCE, place_name, {"data": data, "fetched_at": time.time()},
+                      ttl=cache.negative_ttl if data.get("fallbacks") else None)
+            return data
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def get(self, place_name, wait=0, location=None):
+        """
+        Returns (data, status) with status "fresh", "stale", "degraded" (some
+        parts fell back) or "pending" (data is None only while pending). With `wait` > 0 a first fetch is
+        waited on for up to that many seconds before answering "pending".
+        `location` ({"lat", "lon"}) is passed on to skip geocoding.
+        """
+        entry = self.api_manager.cache.get(self.SOURCE, place_name)
+        if entry is not None and not entry[1]:
+            value = entry[0]
+            if value["data"].get("fallbacks"):
+                self._count("degraded")
+                return value["data"], "degraded"
+            if time.time() - value["fetched_at"] < self.fresh_ttl:
+                self._count("fresh")
+                return value["data"], "fresh"
+            self._submit(place_name, location)
+            self._count("stale")
+            return value["data"], "stale"
+
+        future = self._submit(place_name, location)
+        if wait > 0:
+            try:
+                data = future.result(timeout=wait)
+                return data, "degraded" if data.get("fallbacks") else "fresh"
+            except FutureTimeoutError:
+                pass
+            except Exception as e:
+                print(f"Background enrichment failed for {place_name}: {e}")
+        self._count("pending")
+        return None, "pending"
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["inflight"] = len(self._inflight)
+        return stats
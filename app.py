@@ -1,12 +1,19 @@
-from flask import Flask, render_template, request, jsonify
-from ml_engine import RecommendationEngine
+from flask import Flask, render_template, request, jsonify, stream_template, stream_with_context, Response, url_for, redirect
+from ml_engine import RecommendationEngine, MAX_TRIP_DAYS
+from response_cache import ResponseCache
+import index_bundle
+import metrics
+import hmac
+import json
 import os
+import time
 
 app = Flask(__name__)
 
 # Initialize ML Engine
 # Ensure data exists and is preprocessed
-if not os.path.exists("tourism_data.csv"):
+# A shipped index bundle is enough to serve; only crawl when there is neither
+if not os.path.exists("tourism_data.csv") and index_bundle.read_manifest() is None:
     import data_generator
     data_generator.generate_data()
 
@@ -15,20 +22,98 @@ if not os.path.exists("preprocessed_tourism_data.csv"):
     preprocess.preprocess_data()
 
 engine = RecommendationEngine()
+engine.warm_up()
+
+def start_background_tasks():
+    """
+    Per-process background work. Threads do not survive a fork, so the
+    pre-fork server (serve.py) calls this in every worker instead of here.
+    """
+    # Fold runtime catalog edits into a fresh TF-IDF fit every few minutes
+    engine.start_background_compaction(interval=int(os.environ.get('TRIPGENIX_COMPACTION_INTERVAL', 300)))
+
+if not os.environ.get('TRIPGENIX_PREFORK'):
+    start_background_tasks()
+
+# Rendered-page cache for the near-static HTML routes; entries are tied to the
+# catalog version, so a rebuilt catalog never serves stale pages
+page_cache = ResponseCache(
+    version_func=lambda: engine.catalog_version,
+    max_items=int(os.environ.get('TRIPGENIX_PAGE_CACHE_SIZE', 512)),
+    ttl=int(os.environ.get('TRIPGENIX_PAGE_CACHE_TTL', 300)),
+    modified_func=lambda: engine.catalog_modified,
+)
+
+def _cache_metrics():
+    families = []
+    for name, stats in (("pages", page_cache.stats()), ("recommendations", engine.result_cache.stats()),
+                        ("enrichment", engine.api_manager.cache.stats())):
+        for counter in ("hits", "misses", "memory_hits", "disk_hits", "negative_hits"):
+            if counter in stats:
+                families.append((name, counter, stats[counter]))
+    return [(
+        "tripgenix_cache_lookups_total", "counter", "Cache lookups by cache and outcome.",
+        [({"cache": name, "outcome": counter}, value) for name, counter, value in families],
+    )]
+
+metrics.REGISTRY.register_collector(_cache_metrics)
+
+@app.before_request
+def _start_timer():
+    request.environ['tripgenix.started'] = time.perf_counter()
+
+@app.after_request
+def _observe_request(response):
+    started = request.environ.get('tripgenix.started')
+    if started is not None:
+        # Streamed responses are timed up to their first byte
+        metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=request.endpoint or "unmatched",
+                                             method=request.method, status=response.status_code)
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """
+    Prometheus text exposition of this process's counters and histograms.
+    """
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
 def home():
     return render_template('index.html')
 
+@app.route('/ready')
+def ready():
+    """
+    Readiness probe: 200 once the engine is loaded and warmed up, 503 before.
+    """
+    if not engine.ready:
+        return jsonify({"ready": False}), 503
+    return jsonify({"ready": True, "catalog_version": engine.catalog_version, "pid": os.getpid()})
+
+def _parse_days(value):
+    """
+    (days, None) for an integer in [1, MAX_TRIP_DAYS], otherwise (None, error message).
+    """
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        days = None
+    if days is None or not 1 <= days <= MAX_TRIP_DAYS:
+        return None, f"'days' must be an integer in [1, {MAX_TRIP_DAYS}]"
+    return days, None
+
 @app.route('/recommend', methods=['POST'])
 def recommend():
     data = request.json
     budget = data.get('budget', '')
     state = data.get('state', '')
     district = data.get('district', '')
-    days = data.get('days', 3)
     interests = data.get('interests', '')
-    
+    days, error = _parse_days(data.get('days', 3))
+    if error:
+        return jsonify({"error": error}), 400
+
     recommendations = engine.get_recommendations(
         state=state, 
         district=district, 
@@ -37,24 +122,289 @@ def recommend():
         days=days
     )
     
-    return jsonify(recommendations)
+    with metrics.stage("recommend", "serialize"):
+        return jsonify(recommendations)
+
+# Upper bounds on queries per batch request and results per query
+MAX_BATCH_QUERIES = int(os.environ.get('TRIPGENIX_MAX_BATCH', 1000))
+MAX_BATCH_TOP_K = 50
+
+@app.route('/recommend/batch', methods=['POST'])
+def recommend_batch():
+    data = request.json or {}
+    queries = data.get('queries', [])
+    if not isinstance(queries, list) or not all(isinstance(q, dict) for q in queries):
+        return jsonify({"error": "'queries' must be a list of objects"}), 400
+    if len(queries) > MAX_BATCH_QUERIES:
+        return jsonify({"error": f"At most {MAX_BATCH_QUERIES} queries per batch"}), 400
+
+    try:
+        top_k = int(data.get('top_k', 5))
+    except (TypeError, ValueError):
+        top_k = None
+    if top_k is None or not 1 <= top_k <= MAX_BATCH_TOP_K:
+        return jsonify({"error": f"'top_k' must be an integer in [1, {MAX_BATCH_TOP_K}]"}), 400
+    for query in queries:
+        _, error = _parse_days(query.get('days', 3))
+        if error:
+            return jsonify({"error": error}), 400
+
+    results = engine.get_recommendations_batch(queries, top_k=top_k)
+    return jsonify({"results": results})
+
+@app.route('/plan', methods=['POST'])
+def plan_trip():
+    """
+    Day-by-day multi-stop route over the recommended places. Takes the
+    /recommend fields plus max_price_day (daily Price_Day limit) and
+    candidates (how many recommendations to route over).
+    """
+    data = request.json or {}
+    try:
+        plan = engine.plan_trip(
+            state=data.get('state', ''),
+            district=data.get('district', ''),
+            budget=data.get('budget', ''),
+            interests=data.get('interests', ''),
+            days=data.get('days', 3),
+            max_price_day=data.get('max_price_day'),
+            category=data.get('category', ''),
+            candidates=data.get('candidates', 30),
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    with metrics.stage("plan", "serialize"):
+        return jsonify(plan)
 
 @app.route('/states')
+@page_cache.cached
 def states_directory():
     all_states = engine.get_all_states()
     return render_template('states.html', states=all_states)
 
+# Destinations per HTML page, and the cap on the JSON API's page size
+STATE_PAGE_SIZE = int(os.environ.get('TRIPGENIX_STATE_PAGE_SIZE', 24))
+MAX_STATE_API_LIMIT = 500
+
 @app.route('/state/<state_name>')
+@page_cache.cached
 def state_detail(state_name):
-    destinations = engine.get_destinations_by_state(state_name)
-    return render_template('state_detail.html', state_name=state_name, destinations=destinations)
+    page = request.args.get('page', 1, type=int)
+    listing = engine.get_destinations_by_state_page(state_name, page=page, per_page=STATE_PAGE_SIZE)
+    # Streamed, so the header goes out before the cards (and their itineraries) are built
+    return stream_template('state_detail.html', state_name=state_name,
+                           destinations=listing['items'], listing=listing)
+
+@app.route('/api/state/<state_name>')
+def state_destinations_api(state_name):
+    limit = min(request.args.get('limit', 50, type=int), MAX_STATE_API_LIMIT)
+    try:
+        listing = engine.get_destinations_by_state_after(state_name, cursor=request.args.get('cursor') or None, limit=limit)
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    def generate():
+        yield '{"state": %s, "total": %d, "items": [' % (json.dumps(state_name), listing['total'])
+        for i, item in enumerate(listing['items']):
+            yield (',' if i else '') + json.dumps(item, default=str)
+        yield '], "next_cursor": %s}' % json.dumps(listing['next_cursor'])
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+@app.route('/nearby')
+def nearby():
+    """
+    Destinations near ?place=<name> or ?lat=&lon=, closest first.
+    Optional k (max results) and radius_km.
+    """
+    try:
+        result = engine.get_nearby(
+            place_name=request.args.get('place') or None,
+            lat=request.args.get('lat', type=float),
+            lon=request.args.get('lon', type=float),
+            radius_km=request.args.get('radius_km', type=float),
+            k=request.args.get('k', type=int),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if result is None:
+        return jsonify({"error": "Place not found"}), 404
+    return jsonify(result)
+
+# Autocomplete result cap, and the match score a missing /place/<name> needs
+# to redirect to the closest place (see search_index for the score scale)
+MAX_SEARCH_RESULTS = 25
+MIN_PLACE_REDIRECT_SCORE = 0.6
+
+@app.route('/search')
+def search():
+    """
+    Autocomplete: ?q=<text>&limit=N, ranked place/district/state matches with
+    a link to their page where there is one.
+    """
+    query = request.args.get('q', '')
+    limit = max(1, min(request.args.get('limit', 10, type=int), MAX_SEARCH_RESULTS))
+    results = engine.search(query, limit=limit)
+    for hit in results:
+        if hit['kind'] == 'place':
+            hit['url'] = url_for('place_detail', place_name=hit['name'])
+        elif hit['kind'] == 'state':
+            hit['url'] = url_for('state_detail', state_name=hit['name'])
+        else:
+            hit['url'] = None
+    return jsonify({"query": query, "results": results})
+
+# Render place pages from the catalog and load enrichment from the JSON
+# endpoint below (default), or block on the upstream APIs as before ('0')
+ASYNC_PLACE_DETAILS = os.environ.get('TRIPGENIX_ASYNC_DETAILS', '1') != '0'
+# Held requests occupy a worker thread (the whole worker with serve.py's
+# default of one thread), so the page polls instead and waits stay short
+MAX_ENRICHMENT_WAIT = 0.5
 
 @app.route('/place/<place_name>')
+@page_cache.cached
 def place_detail(place_name):
-    place = engine.get_place_details(place_name)
+    if ASYNC_PLACE_DETAILS:
+        place = engine.get_place_summary(place_name)
+    else:
+        place = engine.get_place_details(place_name)
     if not place:
+        # Partial or misspelled names go to the closest place instead of a 404
+        best = next((hit for hit in engine.search(place_name, limit=1) if hit['kind'] == 'place'), None)
+        if best and best['score'] >= MIN_PLACE_REDIRECT_SCORE:
+            return redirect(url_for('place_detail', place_name=best['name']))
         return "Place not found", 404
-    return render_template('place_detail.html', place=place)
+    enrichment_url = url_for('place_enrichment', place_name=place_name) if ASYNC_PLACE_DETAILS else None
+    return render_template('place_detail.html', place=place, enrichment_url=enrichment_url)
+
+@app.route('/api/place/<place_name>/enrichment')
+def place_enrichment(place_name):
+    """
+    Images, hotels and description for a place page. 202 while the first fetch
+    is still running; `?wait=<seconds>` holds the request for up to
+    MAX_ENRICHMENT_WAIT seconds for it instead.
+    """
+    wait = min(max(request.args.get('wait', 0, type=float), 0.0), MAX_ENRICHMENT_WAIT)
+    enrichment = engine.get_place_enrichment(place_name, wait=wait)
+    if enrichment is None:
+        return jsonify({"error": "Place not found"}), 404
+    return jsonify(enrichment), 202 if enrichment['status'] == 'pending' else 200
+
+def _is_admin():
+    """
+    Admin routes require TRIPGENIX_ADMIN_TOKEN to be set and sent back in the
+    X-Admin-Token header; without the variable they are disabled.
+    """
+    token = os.environ.get('TRIPGENIX_ADMIN_TOKEN')
+    # Constant-time comparison, so response timing does not reveal the token
+    return bool(token) and hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode(), token.encode())
+
+# Under serve.py with several workers, catalog edits and page-cache flushes
+# would only reach the worker that happens to answer; they are refused instead
+PER_WORKER_STATE = bool(os.environ.get('TRIPGENIX_PREFORK')) and \
+    int(os.environ.get('TRIPGENIX_PREFORK_WORKERS', 1)) > 1
+
+def _refuse_per_worker_change():
+    if not PER_WORKER_STATE:
+        return None
+    return jsonify({
+        "error": "Running with several pre-fork workers; this change would only reach one of them. "
+                 "Rebuild the index bundle and restart the workers instead."
+    }), 409
+
+@app.route('/admin/cache/invalidate', methods=['POST'])
+def invalidate_page_cache():
+    """
+    Admin hook for catalog rebuilds; optional JSON {"prefix": "/state/"}.
+    """
+    if not _is_admin():
+        return jsonify({"error": "Forbidden"}), 403
+    refused = _refuse_per_worker_change()
+    if refused:
+        return refused
+    prefix = (request.get_json(silent=True) or {}).get('prefix')
+    removed = page_cache.invalidate(prefix)
+    return jsonify({"invalidated": removed, "stats": page_cache.stats()})
+
+@app.route('/admin/cache/stats')
+def cache_stats():
+    if not _is_admin():
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify({
+        "pages": page_cache.stats(),
+        "recommendations": engine.result_cache.stats(),
+        "catalog_version": engine.catalog_version,
+    })
+
+# Sampling interval bounds; shorter intervals would keep the sampler thread
+# spinning on the GIL
+MIN_PROFILER_INTERVAL = 0.001
+MAX_PROFILER_INTERVAL = 10.0
+
+@app.route('/admin/profiler', methods=['GET', 'POST'])
+def profiler():
+    """
+    Sampling profiler for this worker. POST {"enabled": true, "interval": 0.01}
+    starts it and {"enabled": false} stops it; GET returns the collected
+    folded stacks (?limit=N for the top N) as text.
+    """
+    if not _is_admin():
+        return jsonify({"error": "Forbidden"}), 403
+    if request.method == 'GET':
+        return Response(metrics.PROFILER.report(request.args.get('limit', type=int)), mimetype='text/plain')
+    data = request.get_json(silent=True) or {}
+    if data.get('enabled'):
+        interval = data.get('interval')
+        if interval is not None:
+            try:
+                interval = float(interval)
+            except (TypeError, ValueError):
+                interval = None
+            if interval is None or not MIN_PROFILER_INTERVAL <= interval <= MAX_PROFILER_INTERVAL:
+                return jsonify({"error": f"'interval' must be a number of seconds in "
+                                         f"[{MIN_PROFILER_INTERVAL}, {MAX_PROFILER_INTERVAL}]"}), 400
+        metrics.PROFILER.start(interval=interval)
+    else:
+        metrics.PROFILER.stop()
+    return jsonify(metrics.PROFILER.status())
+
+@app.route('/admin/destinations', methods=['POST'])
+def upsert_destination():
+    if not _is_admin():
+        return jsonify({"error": "Forbidden"}), 403
+    refused = _refuse_per_worker_change()
+    if refused:
+        return refused
+    destination = request.get_json(silent=True)
+    if not isinstance(destination, dict):
+        return jsonify({"error": "Expected a destination object"}), 400
+    try:
+        row = engine.upsert_destination(destination)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"row": row, "catalog_version": engine.catalog_version})
+
+@app.route('/admin/destinations/<place_name>', methods=['DELETE'])
+def delete_destination(place_name):
+    if not _is_admin():
+        return jsonify({"error": "Forbidden"}), 403
+    refused = _refuse_per_worker_change()
+    if refused:
+        return refused
+    deleted = engine.delete_destination(place_name)
+    if not deleted:
+        return jsonify({"error": "Place not found"}), 404
+    return jsonify({"deleted": deleted, "catalog_version": engine.catalog_version})
+
+@app.route('/admin/catalog/compact', methods=['POST'])
+def compact_catalog():
+    if not _is_admin():
+        return jsonify({"error": "Forbidden"}), 403
+    refused = _refuse_per_worker_change()
+    if refused:
+        return refused
+    live_rows = engine.compact()
+    return jsonify({"rows": live_rows, "catalog_version": engine.catalog_version})
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=10000)
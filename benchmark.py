@@ -0,0 +1,329 @@
+import numpy as np
+import pandas as pd
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import multiprocessing
+import data_generator
+import ranking
+
+SYNTHETIC_STATES = [
+    "Andhra Pradesh", "Assam", "Bihar", "Goa", "Gujarat", "Himachal Pradesh", "Jammu and Kashmir",
+    "Karnataka", "Kerala", "Madhya Pradesh", "Maharashtra", "Meghalaya", "Odisha", "Punjab",
+    "Rajasthan", "Sikkim", "Tamil Nadu", "Telangana", "Uttar Pradesh", "Uttarakhand", "West Bengal",
+]
+SYNTHETIC_ACTIVITIES = {
+    "Hill Station": ["Trekking", "Boating", "Tea Gardens", "Sunrise Point", "Camping"],
+    "Beach": ["Swimming", "Surfing", "Seafood", "Sunset Cruise", "Snorkeling"],
+    "Heritage": ["Monument Tour", "History", "Architecture", "Light show", "Photography"],
+    "Adventure": ["Rafting", "Paragliding", "Bungee", "Rock Climbing", "Zipline"],
+    "Spiritual": ["Temple Visit", "Meditation", "Aarti", "Pilgrimage", "Yoga"],
+    "Wildlife": ["Safari", "Bird Watching", "Jungle Trek", "Photography", "Nature Walk"],
+    "Backwaters": ["Houseboat", "Canoeing", "Village Tour", "Fishing", "Ayurveda"],
+}
+DURATIONS = ["1 day", "1-2 days", "2-3 days", "3-4 days", "5 days"]
+BUDGETS = list(ranking.BUDGET_PRICES)
+
+
+def generate_synthetic_catalog(n_rows, output_file, seed=0):
+    """
+    Writes a tourism_data.csv-shaped catalog of `n_rows` synthetic destinations.
+    Categories and reviews come from data_generator's templates; coordinates
+    are uniform over India's bounding box. Deterministic for a given seed.
+    """
+    rng = np.random.default_rng(seed)
+    random.seed(seed)
+
+    categories = rng.choice(data_generator.REVIEW_CATEGORIES, size=n_rows)
+    states = rng.choice(SYNTHETIC_STATES, size=n_rows)
+    budgets = rng.choice(BUDGETS, size=n_rows)
+    districts = rng.integers(1, 40, size=n_rows)
+    rows = []
+    for i in range(n_rows):
+        category = str(categories[i])
+        place = f"{category} Retreat {i}"
+        activities = ", ".join(random.sample(SYNTHETIC_ACTIVITIES[category], 3))
+        description = f"Discover the beauty of {place}."
+        review = data_generator.generate_reviews(place, category)
+        rows.append({
+            "Place": place,
+            "State": str(states[i]),
+            "District": f"{states[i]} District {districts[i]}",
+            "Category": category,
+            "Activities": activities,
+            "Budget": str(budgets[i]),
+            "Duration_Suitability": DURATIONS[i % len(DURATIONS)],
+            "Description": description,
+            "Image": f"https://picsum.photos/seed/{i}/800/600",
+            "Map_Link": f"https://www.google.com/maps/search/?api=1&query={urllib.parse.quote(place)}",
+            "Review": review,
+            "Combined_Features": f"{category} {activities} {budgets[i]} {states[i]} {description} {review}",
+            "Price_Day": ranking.BUDGET_PRICES[str(budgets[i])],
+        })
+    df = pd.DataFrame(rows)
+    df['Latitude'] = rng.uniform(8.0, 35.0, size=n_rows).round(6)
+    df['Longitude'] = rng.uniform(68.0, 97.0, size=n_rows).round(6)
+    df['Rating'] = rng.choice([4.2, 4.5, 4.7, 4.8, 4.9, 5.0], size=n_rows)
+    df.to_csv(output_file, index=False)
+    return df
+
+
+class StubUpstream:
+    """
+    Local stand-in for Nominatim, Wikipedia and Unsplash, so benchmarks never
+    touch the network. Every response is delayed by `latency` seconds plus up
+    to `jitter` seconds. Point the API manager at it with environ().
+    """
+    def __init__(self, latency=0.05, jitter=0.0, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.jitter = jitter
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(stub.latency + random.uniform(0, stub.jitter))
+                parsed = urllib.parse.urlsplit(self.path)
+                query = urllib.parse.parse_qs(parsed.query)
+                if parsed.path == "/search":
+                    name = query.get("q", [""])[0]
+                    body = [{"lat": "20.5", "lon": "78.9", "display_name": f"{name} Stay {i}, India",
+                             "class": "tourism", "type": "hotel"} for i in range(5)]
+                elif parsed.path.startswith("/api/rest_v1/page/summary/"):
+                    title = urllib.parse.unquote(parsed.path.rsplit("/", 1)[-1])
+                    body = {"title": title, "extract": f"{title} is a synthetic destination."}
+                elif parsed.path == "/search/photos":
+                    body = {"results": [{"urls": {"regular": f"https://picsum.photos/seed/stub{i}/800/600"}}
+                                        for i in range(10)]}
+                else:
+                    self.send_error(404)
+                    return
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="tripgenix-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def environ(self):
+        return {
+            "TRIPGENIX_NOMINATIM_URL": self.url,
+            "TRIPGENIX_WIKIPEDIA_URL": self.url,
+            "TRIPGENIX_UNSPLASH_URL": self.url,
+            "UNSPLASH_KEY": "benchmark",
+        }
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def measure(operation, inputs, concurrency=1):
+    """
+    Runs operation(x) for every x in `inputs` and summarizes the per-call
+    latencies (ms) and the overall throughput (ops/s).
+    """
+    latencies = []
+
+    def timed(x):
+        started = time.perf_counter()
+        operation(x)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = list(executor.map(timed, inputs))
+    else:
+        latencies = [timed(x) for x in inputs]
+    wall = time.perf_counter() - started
+
+    latencies = np.asarray(latencies) * 1000
+    return {
+        "ops": len(inputs),
+        "concurrency": concurrency,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3) if len(latencies) else None,
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3) if len(latencies) else None,
+        "mean_ms": round(float(latencies.mean()), 3) if len(latencies) else None,
+        "throughput_ops": round(len(inputs) / wall, 2) if wall else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_size(n_rows, iterations=200, concurrency=1, latency=0.05, jitter=0.0, seed=0, backend=None):
+    """
+    Benchmarks one catalog size in the current process (run_benchmark gives
+    each size a fresh process, so peak RSS is per size).
+    """
+    work_dir = tempfile.mkdtemp(prefix=f"tripgenix-bench-{n_rows}-")
+    stub = StubUpstream(latency=latency, jitter=jitter).start()
+    try:
+        os.environ.update(stub.environ())
+        os.environ["TRIPGENIX_CACHE_PATH"] = os.path.join(work_dir, "enrichment_cache.db")
+        if backend:
+            os.environ["TRIPGENIX_RETRIEVAL"] = backend
+        from ml_engine import RecommendationEngine
+
+        data_path = os.path.join(work_dir, "tourism_data.csv")
+        bundle_dir = os.path.join(work_dir, "index_bundle")
+        started = time.perf_counter()
+        df = generate_synthetic_catalog(n_rows, data_path, seed=seed)
+        result = {"rows": n_rows, "generate_s": round(time.perf_counter() - started, 3)}
+
+        # Cold start without a bundle (fits and writes it), then from the bundle
+        started = time.perf_counter()
+        RecommendationEngine(data_path=data_path, bundle_dir=bundle_dir)
+        result["cold_start_build_s"] = round(time.perf_counter() - started, 3)
+        started = time.perf_counter()
+        engine = RecommendationEngine(data_path=data_path, bundle_dir=bundle_dir)
+        result["cold_start_load_s"] = round(time.perf_counter() - started, 3)
+        result["warm_up_s"] = round(engine.warm_up(), 3)
+        result["startup_peak_rss_mb"] = peak_rss_mb()
+
+        rng = random.Random(seed)
+        categories = data_generator.REVIEW_CATEGORIES
+        queries = [
+            {
+                "state": rng.choice(["All"] + SYNTHETIC_STATES),
+                "budget": rng.choice(BUDGETS),
+                "interests": " ".join(rng.sample(SYNTHETIC_ACTIVITIES[rng.choice(categories)], 2)),
+                "days": rng.randint(1, 5),
+            }
+            for _ in range(iterations)
+        ]
+        states = engine.get_all_states()
+        places = df['Place'].sample(n=min(iterations, n_rows), random_state=seed).tolist()
+
+        result["paths"] = {
+            "get_recommendations": measure(
+                lambda q: engine.get_recommendations(q["state"], "", q["budget"], q["interests"], days=q["days"]),
+                queries, concurrency),
+            "get_recommendations_batch": measure(
+                lambda batch: engine.get_recommendations_batch(batch),
+                [queries[i:i + 32] for i in range(0, len(queries), 32)], concurrency),
+            # Full listings build every card; a handful of calls is enough
+            "get_destinations_by_state": measure(
+                lambda state: engine.get_destinations_by_state(state),
+                [rng.choice(states) for _ in range(min(iterations, 10))], concurrency),
+            "get_destinations_by_state_page": measure(
+                lambda state: list(engine.get_destinations_by_state_page(state)['items']),
+                [rng.choice(states) for _ in range(iterations)], concurrency),
+            # Distinct places, so every call goes through the stub upstream
+            "get_place_details": measure(
+                lambda place: engine.get_place_details(place), places, concurrency),
+        }
+        return result
+    finally:
+        stub.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmark(sizes, **options):
+    """
+    Benchmarks every catalog size in its own spawned process and returns the
+    machine-readable report.
+    """
+    report = {
+        "started_at": time.time(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "options": options,
+        "results": [],
+    }
+    for n_rows in sizes:
+        print(f"Benchmarking {n_rows} destinations...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            report["results"].append(executor.submit(run_size, n_rows, **options).result())
+    return report
+
+
+def print_report(report, baseline=None):
+    """
+    Human-readable summary; with a baseline report, p50/p99/throughput are
+    shown as ratios against the matching size and path.
+    """
+    previous = {}
+    for result in (baseline or {}).get("results", []):
+        for path, stats in result["paths"].items():
+            previous[(result["rows"], path)] = stats
+
+    for result in report["results"]:
+        print(f"\n{result['rows']} rows: build {result['cold_start_build_s']}s, load {result['cold_start_load_s']}s, "
+              f"warm-up {result['warm_up_s']}s, startup peak RSS {result['startup_peak_rss_mb']} MB")
+        for path, stats in result["paths"].items():
+            line = (f"  {path:32s} p50 {stats['p50_ms']:>9} ms  p99 {stats['p99_ms']:>9} ms  "
+                    f"{stats['throughput_ops']:>9} ops/s  peak RSS {stats['peak_rss_mb']} MB")
+            old = previous.get((result["rows"], path))
+            if old and old["p50_ms"] and old["p99_ms"] and old["throughput_ops"]:
+                line += (f"  (p50 x{stats['p50_ms'] / old['p50_ms']:.2f}, p99 x{stats['p99_ms'] / old['p99_ms']:.2f}, "
+                         f"throughput x{stats['throughput_ops'] / old['throughput_ops']:.2f})")
+            print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the TripGenix engine on synthetic catalogs.")
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated catalog sizes, e.g. 1000,100000,1000000")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per path")
+    parser.add_argument("--concurrency", type=int, default=1, help="Threads issuing calls")
+    parser.add_argument("--upstream-latency-ms", type=float, default=50, help="Stub upstream response delay")
+    parser.add_argument("--upstream-jitter-ms", type=float, default=0, help="Extra random stub delay, up to this much")
+    parser.add_argument("--backend", default=None, help="Retrieval backend ('brute' or 'ann')")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON report")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        [int(size) for size in args.sizes.split(",") if size.strip()],
+        iterations=args.iterations, concurrency=args.concurrency,
+        latency=args.upstream_latency_ms / 1000, jitter=args.upstream_jitter_ms / 1000,
+        seed=args.seed, backend=args.backend,
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"\nReport written to {args.output}")
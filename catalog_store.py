@@ -0,0 +1,168 @@
+import pandas as pd
+import numpy as np
+import argparse
+import json
+import os
+import shutil
+
+# Bump whenever the on-disk layout changes
+STORE_VERSION = 1
+
+# Low-cardinality columns stored as integer codes + a category list
+CATEGORICAL_COLUMNS = ['State', 'District', 'Budget', 'Category']
+
+# Long display text the serving engine does not rank on; it is left on disk
+# and fetched by row id only when a page actually shows it
+LAZY_TEXT_COLUMNS = ['Description', 'Review', 'Combined_Features']
+
+
+def _smallest_code_dtype(n_categories):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def write_store(df, store_dir):
+    """
+    Writes a DataFrame as a numpy-backed columnar store, one file set per column:
+    - categorical: <col>.codes.npy (smallest int dtype, -1 = missing) + categories in schema.json
+    - numeric: <col>.npy in its native dtype
+    - text: <col>.blob.npy (UTF-8 bytes) + <col>.offsets.npy (int64, n+1) + optional <col>.nulls.npy
+    Every array is a plain .npy file, so readers can memory-map them.
+    The store is written to a temp directory and swapped in.
+    """
+    tmp_dir = f"{store_dir}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+
+    schema = {"version": STORE_VERSION, "rows": int(len(df)), "columns": []}
+    for column in df.columns:
+        series = df[column]
+        if column in CATEGORICAL_COLUMNS:
+            categorical = series.astype('category')
+            categories = [str(c) for c in categorical.cat.categories]
+            codes = categorical.cat.codes.to_numpy().astype(_smallest_code_dtype(len(categories)))
+            np.save(os.path.join(tmp_dir, f"{column}.codes.npy"), codes)
+            schema["columns"].append({"name": column, "kind": "categorical", "categories": categories})
+        elif pd.api.types.is_numeric_dtype(series):
+            np.save(os.path.join(tmp_dir, f"{column}.npy"), series.to_numpy())
+            schema["columns"].append({"name": column, "kind": "numeric"})
+        else:
+            nulls = series.isna().to_numpy()
+            encoded = [b"" if null else str(value).encode("utf-8") for value, null in zip(series, nulls)]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(value) for value in encoded], out=offsets[1:])
+            np.save(os.path.join(tmp_dir, f"{column}.blob.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+            np.save(os.path.join(tmp_dir, f"{column}.offsets.npy"), offsets)
+            if nulls.any():
+                np.save(os.path.join(tmp_dir, f"{column}.nulls.npy"), nulls)
+            schema["columns"].append({"name": column, "kind": "text", "has_nulls": bool(nulls.any())})
+
+    with open(os.path.join(tmp_dir, "schema.json"), "w", encoding="utf-8") as f:
+        json.dump(schema, f, indent=2)
+
+    old_dir = f"{store_dir}.old-{os.getpid()}"
+    if os.path.exists(store_dir):
+        os.replace(store_dir, old_dir)
+    os.replace(tmp_dir, store_dir)
+    if os.path.exists(old_dir):
+        shutil.rmtree(old_dir)
+    return schema
+
+
+def convert_csv(csv_path, store_dir):
+    """
+    Converts one of the pipeline CSVs (external_dataset, tourism_data,
+    preprocessed_tourism_data) into a columnar store.
+    """
+    df = pd.read_csv(csv_path)
+    schema = write_store(df, store_dir)
+    print(f"Converted {csv_path} -> {store_dir}: {schema['rows']} rows, {len(schema['columns'])} columns.")
+    return schema
+
+
+class CatalogStore:
+    """
+    Read side of the columnar store. Arrays are memory-mapped, so opening a
+    store is cheap and worker processes share the pages.
+    1. load_frame(columns) materializes only the projected columns, with
+       categorical dtypes for the categorical ones.
+       Text columns are decoded in one pass over their blob.
+    2. get_value(column, row) decodes a single cell, for lazily fetched text.
+    """
+    def __init__(self, store_dir, mmap=True):
+        self.store_dir = store_dir
+        self._mmap_mode = "r" if mmap else None
+        with open(os.path.join(store_dir, "schema.json"), encoding="utf-8") as f:
+            self.schema = json.load(f)
+        if self.schema.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported catalog store version {self.schema.get('version')} in {store_dir}")
+        self.n_rows = self.schema["rows"]
+        self._columns = {column["name"]: column for column in self.schema["columns"]}
+        self._arrays = {}
+
+    @property
+    def columns(self):
+        return [column["name"] for column in self.schema["columns"]]
+
+    def _load(self, filename):
+        if filename not in self._arrays:
+            self._arrays[filename] = np.load(os.path.join(self.store_dir, filename), mmap_mode=self._mmap_mode)
+        return self._arrays[filename]
+
+    def load_column(self, column):
+        spec = self._columns[column]
+        if spec["kind"] == "categorical":
+            return pd.Categorical.from_codes(np.asarray(self._load(f"{column}.codes.npy")), spec["categories"])
+        if spec["kind"] == "numeric":
+            return self._load(f"{column}.npy")
+        return self._load_text(column, spec)
+
+    def _load_text(self, column, spec):
+        """
+        Decodes a whole text column: the blob is read into memory once and cut
+        at the offsets, instead of one memmap slice and decode per cell.
+        """
+        offsets = np.asarray(self._load(f"{column}.offsets.npy")).tolist()
+        data = self._load(f"{column}.blob.npy").tobytes()
+        text = data.decode("utf-8")
+        if len(text) == len(data):
+            # Pure ASCII: byte offsets are character offsets
+            values = [text[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+        else:
+            values = [data[start:end].decode("utf-8") for start, end in zip(offsets[:-1], offsets[1:])]
+        if spec.get("has_nulls"):
+            for row in np.flatnonzero(self._load(f"{column}.nulls.npy")).tolist():
+                values[row] = np.nan
+        return values
+
+    def load_frame(self, columns=None, exclude=None):
+        """
+        Builds a DataFrame of the requested columns (all by default) in stored order.
+        """
+        names = [name for name in self.columns
+                 if (columns is None or name in columns) and not (exclude and name in exclude)]
+        return pd.DataFrame({name: self.load_column(name) for name in names}, index=pd.RangeIndex(self.n_rows))
+
+    def get_value(self, column, row):
+        spec = self._columns[column]
+        if spec["kind"] == "categorical":
+            code = int(self._load(f"{column}.codes.npy")[row])
+            return np.nan if code < 0 else spec["categories"][code]
+        if spec["kind"] == "numeric":
+            return self._load(f"{column}.npy")[row].item()
+        if spec.get("has_nulls") and self._load(f"{column}.nulls.npy")[row]:
+            return np.nan
+        offsets = self._load(f"{column}.offsets.npy")
+        blob = self._load(f"{column}.blob.npy")
+        return bytes(blob[offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a catalog CSV into the columnar store.")
+    parser.add_argument("csv", help="Input CSV, e.g. tourism_data.csv")
+    parser.add_argument("out", help="Output store directory")
+    args = parser.parse_args()
+    convert_csv(args.csv, args.out)
@@ -2,8 +2,14 @@ import pandas as pd
 import time
 import os
 import random
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 # Replaced GooglePlacesHelper with TripGenixAPIManager
-from api_manager import TripGenixAPIManager
+from api_manager import TripGenixAPIManager, make_http_client, parse_rate_limits
+
+# Categories with their own review templates in generate_reviews
+REVIEW_CATEGORIES = ["Hill Station", "Beach", "Heritage", "Adventure", "Spiritual", "Wildlife", "Backwaters"]
 
 def generate_reviews(place_name, category):
     """
@@ -58,66 +64,160 @@ def generate_reviews(place_name, category):
     choices = templates.get(category, generic) + generic
     return random.choice(choices)
 
-def generate_data():
-    api_manager = TripGenixAPIManager()
-    data = []
-    
+def enrich_destination(api_manager, d):
+    """
+    Enriches a single destination row with API data, a review, rating,
+    combined TF-IDF features and a standard price.
+    """
+    d = dict(d)
+
+    # 1. Fetch Dynamic Data
+    enriched = api_manager.enrich_place(d['Place'])
+
+    # 2. Merge Data
+    if enriched:
+        d['Description'] = enriched['about']
+        d['Image'] = enriched['images'][0] if enriched['images'] else "https://via.placeholder.com/800x500"
+        d['Map_Link'] = enriched['map']
+        d['Latitude'] = enriched['location']['lat']
+        d['Longitude'] = enriched['location']['lon']
+    else:
+        d['Description'] = f"Explore {d['Place']}."
+        d['Image'] = "https://via.placeholder.com/800x500"
+        d['Map_Link'] = ""
+        d['Latitude'] = 0.0
+        d['Longitude'] = 0.0
+
+    # Review Generation
+    d['Review'] = generate_reviews(d['Place'], d['Category'])
+    d['Rating'] = random.choice([4.2, 4.5, 4.7, 4.8, 4.9, 5.0])
+
+    # 3. Create Combined Features for TF-IDF
+    d['Combined_Features'] = f"{d['Category']} {d['Activities']} {d['Budget']} {d['State']} {d['Description']} {d['Review']}"
+
+    # 4. Standard Price
+    if d['Budget'] == "Low": d['Price_Day'] = 2500
+    elif d['Budget'] == "Medium": d['Price_Day'] = 5500
+    else: d['Price_Day'] = 12000
+
+    return d
+
+def _row_key(d):
+    return f"{d.get('Place', '')}|{d.get('State', '')}|{d.get('District', '')}".lower()
+
+def _json_default(value):
+    # numpy scalars coming out of pandas records
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+def load_checkpoint(checkpoint_file):
+    """
+    Reads the JSONL checkpoint into {row_key: (enriched_at, row)}.
+    Later lines win, and a torn last line from a crash is ignored.
+    """
+    done = {}
+    if not os.path.exists(checkpoint_file):
+        return done
+    with open(checkpoint_file, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            done[entry['key']] = (entry['enriched_at'], entry['row'])
+    return done
+
+def generate_data(input_file="external_dataset.csv", output_file="tourism_data.csv",
+                  checkpoint_file="tourism_data.checkpoint.jsonl", workers=4,
+                  max_age_days=30, resume=True, rate_limits=None):
+    """
+    Parallel, resumable enrichment pipeline:
+    1. Rows are enriched on a worker pool; upstream rate limits are enforced
+       per host by the shared HTTP client, not by sleeping.
+    2. Each enriched row is appended to a JSONL checkpoint as soon as it finishes.
+    3. On restart, rows already in the checkpoint and younger than `max_age_days`
+       are skipped.
+    4. The final CSV is assembled from the checkpoint in input order and swapped
+       in atomically.
+    `rate_limits` ({host: requests per second}) overrides the client's
+    defaults and TRIPGENIX_RATE_LIMITS for this run.
+    """
+    api_manager = TripGenixAPIManager(http=make_http_client(rate_limits) if rate_limits else None)
+
     # Check if external dataset exists
-    if os.path.exists("external_dataset.csv"):
-        print("Loading destinations from external_dataset.csv...")
+    if os.path.exists(input_file):
+        print(f"Loading destinations from {input_file}...")
         try:
-            raw_df = pd.read_csv("external_dataset.csv")
+            raw_df = pd.read_csv(input_file)
             destinations = raw_df.to_dict('records')
         except Exception as e:
             print(f"Error reading external dataset: {e}")
             destinations = []
     else:
-        print("external_dataset.csv not found. Using fallback list.")
+        print(f"{input_file} not found. Using fallback list.")
         # Fallback list (truncated for brevity since we expect the CSV)
         destinations = [
             {"Place": "Ooty", "State": "Tamil Nadu", "District": "Nilgiris", "Category": "Hill Station", "Activities": "Boating", "Budget": "Medium", "Duration_Suitability": "3 days"}
         ]
 
-    print(f"Starting data enrichment process for {len(destinations)} destinations...")
-    
-    for i, d in enumerate(destinations):
-        print(f"Processing {i+1}/{len(destinations)}: {d['Place']}...")
-        
-        # 1. Fetch Dynamic Data
-        enriched = api_manager.enrich_place(d['Place'])
-        
-        # 2. Merge Data
-        if enriched:
-            d['Description'] = enriched['about']
-            d['Image'] = enriched['images'][0] if enriched['images'] else "https://via.placeholder.com/800x500"
-            d['Map_Link'] = enriched['map']
-            d['Latitude'] = enriched['location']['lat']
-            d['Longitude'] = enriched['location']['lon']
-        else:
-            d['Description'] = f"Explore {d['Place']}."
-            d['Image'] = "https://via.placeholder.com/800x500"
-            d['Map_Link'] = ""
-            d['Latitude'] = 0.0
-            d['Longitude'] = 0.0
-
-        # Review Generation
-        d['Review'] = generate_reviews(d['Place'], d['Category'])
-        d['Rating'] = random.choice([4.2, 4.5, 4.7, 4.8, 4.9, 5.0]) 
-
-        # 3. Create Combined Features for TF-IDF
-        d['Combined_Features'] = f"{d['Category']} {d['Activities']} {d['Budget']} {d['State']} {d['Description']} {d['Review']}"
-
-        # 4. Standard Price
-        if d['Budget'] == "Low": d['Price_Day'] = 2500
-        elif d['Budget'] == "Medium": d['Price_Day'] = 5500
-        else: d['Price_Day'] = 12000
-
-        data.append(d)
-        time.sleep(0.1) # Be nice to APIs
+    done = load_checkpoint(checkpoint_file) if resume else {}
+    fresh_after = time.time() - max_age_days * 24 * 3600
+    pending = [d for d in destinations
+               if _row_key(d) not in done or done[_row_key(d)][0] < fresh_after]
+
+    print(f"Starting data enrichment process for {len(destinations)} destinations "
+          f"({len(destinations) - len(pending)} fresh in checkpoint, {len(pending)} to enrich, {workers} workers)...")
+
+    started = time.monotonic()
+    completed = 0
+    with open(checkpoint_file, "a" if resume else "w", encoding="utf-8") as checkpoint, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(enrich_destination, api_manager, d): d for d in pending}
+        for future in as_completed(futures):
+            d = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                # Leave it out of the checkpoint so the next run retries it
+                print(f"Failed to enrich {d['Place']}: {e}")
+                continue
+
+            entry = {"key": _row_key(d), "enriched_at": time.time(), "row": row}
+            checkpoint.write(json.dumps(entry, default=_json_default) + "\n")
+            checkpoint.flush()
+            done[entry['key']] = (entry['enriched_at'], row)
+
+            completed += 1
+            elapsed = time.monotonic() - started
+            rate = completed / elapsed if elapsed else 0.0
+            eta = (len(pending) - completed) / rate if rate else 0.0
+            print(f"Processed {completed}/{len(pending)}: {d['Place']} "
+                  f"({rate:.2f} rows/s, ETA {eta:.0f}s)")
 
+    # Assemble output in input order; rows that failed are skipped until a later run
+    data = [done[_row_key(d)][1] for d in destinations if _row_key(d) in done]
     df = pd.DataFrame(data)
-    df.to_csv("tourism_data.csv", index=False)
-    print(f"tourism_data.csv generated with {len(df)} records.")
+    tmp_file = output_file + ".tmp"
+    df.to_csv(tmp_file, index=False)
+    os.replace(tmp_file, output_file)
+    print(f"{output_file} generated with {len(df)} records.")
 
 if __name__ == "__main__":
-    generate_data()
+    parser = argparse.ArgumentParser(description="Enrich the destination catalog with API data.")
+    parser.add_argument("--input", default="external_dataset.csv")
+    parser.add_argument("--output", default="tourism_data.csv")
+    parser.add_argument("--checkpoint", default="tourism_data.checkpoint.jsonl")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-age-days", type=float, default=30)
+    parser.add_argument("--no-resume", action="store_true", help="Ignore the checkpoint and enrich every row")
+    parser.add_argument("--rate-limit", action="append", default=[], metavar="HOST=RATE",
+                        help="Requests per second for an upstream host (0 = unlimited); repeatable")
+    args = parser.parse_args()
+    try:
+        rate_limits = parse_rate_limits(",".join(args.rate_limit))
+    except ValueError as e:
+        parser.error(str(e))
+    generate_data(input_file=args.input, output_file=args.output, checkpoint_file=args.checkpoint,
+                  workers=args.workers, max_age_days=args.max_age_days, resume=not args.no_resume,
+                  rate_limits=rate_limits)
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+# Mean Earth radius; BallTree's haversine metric works on the unit sphere
+EARTH_RADIUS_KM = 6371.0088
+
+
+def valid_coordinates(lat, lon):
+    """
+    Elementwise: finite, in range, and not the 0.0/0.0 placeholder that
+    data_generator writes when geocoding fails.
+    """
+    lat = np.asarray(pd.to_numeric(lat, errors='coerce'), dtype=float)
+    lon = np.asarray(pd.to_numeric(lon, errors='coerce'), dtype=float)
+    with np.errstate(invalid='ignore'):
+        return (np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+                & ~((lat == 0) & (lon == 0)))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in km, broadcasting over array inputs
+    (e.g. lat1[:, None] against lat2[None, :] gives a full distance matrix).
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=float)) for x in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class GeoIndex:
+    """
+    Spatial index over catalog coordinates:
+    1. Rows with valid coordinates go into a BallTree with the haversine metric.
+    2. Rows added later (catalog upserts) sit in a small pending list that is
+       scanned exactly, until the next compaction rebuilds the tree.
+    query() answers k-nearest and radius searches, or both combined.
+    Row ids are catalog row ids; filtering out tombstoned rows is up to the caller.
+    """
+    def __init__(self, rows, lat, lon):
+        rows = np.asarray(rows, dtype=np.int64)
+        self.rows = rows
+        self.tree = BallTree(np.radians(np.column_stack([lat, lon])), metric='haversine') if len(rows) else None
+        self.pending_rows = np.empty(0, dtype=np.int64)
+        self.pending_lat = np.empty(0)
+        self.pending_lon = np.empty(0)
+
+    @classmethod
+    def from_frame(cls, df):
+        if 'Latitude' not in df.columns or 'Longitude' not in df.columns:
+            return cls([], [], [])
+        valid = valid_coordinates(df['Latitude'], df['Longitude'])
+        rows = np.flatnonzero(valid)
+        return cls(rows, pd.to_numeric(df['Latitude'], errors='coerce').to_numpy(dtype=float)[rows],
+                   pd.to_numeric(df['Longitude'], errors='coerce').to_numpy(dtype=float)[rows])
+
+    def __len__(self):
+        return len(self.rows) + len(self.pending_rows)
+
+    def add(self, row, lat, lon):
+        """
+        Adds one row; returns False (and skips it) if its coordinates are unusable.
+        """
+        if not valid_coordinates(lat, lon):
+            return False
+        self.pending_rows = np.append(self.pending_rows, row)
+        self.pending_lat = np.append(self.pending_lat, float(lat))
+        self.pending_lon = np.append(self.pending_lon, float(lon))
+        return True
+
+    def query(self, lat, lon, k=None, radius_km=None):
+        """
+        Rows nearest to (lat, lon), closest first, as (row ids, distances in km).
+        With radius_km only rows inside the radius are returned; with k at most
+        k rows. At least one of them must be given.
+        """
+        if k is None and radius_km is None:
+            raise ValueError("Give k, radius_km or both")
+        point = np.radians([[float(lat), float(lon)]])
+        found_rows, found_dist = [], []
+
+        if self.tree is not None:
+            if radius_km is not None:
+                indices, distances = self.tree.query_radius(point, r=radius_km / EARTH_RADIUS_KM,
+                                                            return_distance=True, sort_results=True)
+                indices, distances = indices[0], distances[0]
+                if k is not None:
+                    indices, distances = indices[:k], distances[:k]
+            else:
+                distances, indices = self.tree.query(point, k=min(k, len(self.rows)))
+                indices, distances = indices[0], distances[0]
+            found_rows.append(self.rows[indices])
+            found_dist.append(distances * EARTH_RADIUS_KM)
+
+        if len(self.pending_rows):
+            distances = haversine_km(lat, lon, self.pending_lat, self.pending_lon)
+            keep = distances <= radius_km if radius_km is not None else np.ones(len(distances), dtype=bool)
+            found_rows.append(self.pending_rows[keep])
+            found_dist.append(distances[keep])
+
+        if not found_rows:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        rows = np.concatenate(found_rows)
+        distances = np.concatenate(found_dist)
+        order = np.argsort(distances, kind='stable')
+        if k is not None:
+            order = order[:k]
+        return rows[order], distances[order]
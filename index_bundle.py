@@ -0,0 +1,189 @@
+import pandas as pd
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+import catalog_store
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+# Bump whenever the on-disk layout or the fitted model parameters change
+BUNDLE_VERSION = 2
+DEFAULT_BUNDLE_DIR = "index_bundle"
+
+# Parameters the engine fits TfidfVectorizer with; stored in the manifest so a
+# bundle built with different settings is treated as stale
+TFIDF_PARAMS = {"stop_words": "english"}
+
+
+def file_sha256(path):
+    """
+    Streams a file through SHA-256 so large catalogs are hashed in constant memory.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_catalog(data_path):
+    """
+    Reads the catalog CSV and makes sure Combined_Features exists.
+    """
+    df = pd.read_csv(data_path)
+
+    # Ensure Combined_Features exists (backward compatibility or regeneration)
+    if 'Combined_Features' not in df.columns:
+        # Fallback creation if for some reason csv is old
+        df['Combined_Features'] = (
+            df['Category'].fillna('') + " " +
+            df['Activities'].fillna('') + " " +
+            df['Budget'].fillna('') + " " +
+            df['State'].fillna('')
+        )
+    return df
+
+
+def fit_tfidf(df):
+    return fit_tfidf_texts(df['Combined_Features'].fillna(''))
+
+
+def fit_tfidf_texts(texts):
+    tfidf = TfidfVectorizer(**TFIDF_PARAMS)
+    tfidf_matrix = tfidf.fit_transform(texts)
+    return tfidf, tfidf_matrix.tocsr()
+
+
+def build_bundle(data_path="tourism_data.csv", bundle_dir=DEFAULT_BUNDLE_DIR):
+    """
+    Fits the TF-IDF model offline and writes a versioned bundle:
+    - manifest.json: version, source hash, row count, build time
+    - vocabulary.json / idf.npy: everything needed to rebuild the vectorizer
+    - tfidf_data.npy / tfidf_indices.npy / tfidf_indptr.npy: the CSR matrix,
+      stored as raw .npy so workers can memory-map and share the pages
+    - catalog/: the catalog table as a columnar store (see catalog_store.py)
+    The bundle is written to a temp directory and swapped in, so readers never
+    see a half-written bundle.
+    """
+    started = time.time()
+    df = load_catalog(data_path)
+    tfidf, tfidf_matrix = fit_tfidf(df)
+
+    tmp_dir = f"{bundle_dir}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+
+    vocabulary = {term: int(idx) for term, idx in tfidf.vocabulary_.items()}
+    with open(os.path.join(tmp_dir, "vocabulary.json"), "w", encoding="utf-8") as f:
+        json.dump(vocabulary, f)
+    np.save(os.path.join(tmp_dir, "idf.npy"), tfidf.idf_)
+    np.save(os.path.join(tmp_dir, "tfidf_data.npy"), tfidf_matrix.data)
+    np.save(os.path.join(tmp_dir, "tfidf_indices.npy"), tfidf_matrix.indices)
+    np.save(os.path.join(tmp_dir, "tfidf_indptr.npy"), tfidf_matrix.indptr)
+    catalog_store.write_store(df, os.path.join(tmp_dir, "catalog"))
+
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "source_path": os.path.abspath(data_path),
+        "source_sha256": file_sha256(data_path),
+        "tfidf_params": TFIDF_PARAMS,
+        "rows": int(len(df)),
+        "shape": list(tfidf_matrix.shape),
+        "built_at": time.time(),
+    }
+    with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    old_dir = f"{bundle_dir}.old-{os.getpid()}"
+    if os.path.exists(bundle_dir):
+        os.replace(bundle_dir, old_dir)
+    os.replace(tmp_dir, bundle_dir)
+    if os.path.exists(old_dir):
+        shutil.rmtree(old_dir)
+
+    print(f"Index bundle built in {time.time() - started:.2f}s: {len(df)} rows, "
+          f"{len(vocabulary)} terms -> {bundle_dir}")
+    return manifest
+
+
+def read_manifest(bundle_dir=DEFAULT_BUNDLE_DIR):
+    path = os.path.join(bundle_dir, "manifest.json")
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Unreadable bundle manifest in {bundle_dir}: {e}")
+        return None
+
+
+def is_bundle_fresh(bundle_dir=DEFAULT_BUNDLE_DIR, data_path="tourism_data.csv"):
+    """
+    A bundle is fresh if it has the current version and parameters and was built
+    from a source CSV with the same hash. A bundle without its source CSV is
+    trusted as-is, so deployments can ship the bundle alone.
+    """
+    manifest = read_manifest(bundle_dir)
+    if not manifest:
+        return False
+    if manifest.get("version") != BUNDLE_VERSION or manifest.get("tfidf_params") != TFIDF_PARAMS:
+        return False
+    if os.path.exists(data_path):
+        return manifest.get("source_sha256") == file_sha256(data_path)
+    return True
+
+
+def load_bundle(bundle_dir=DEFAULT_BUNDLE_DIR, mmap=True):
+    """
+    Loads a bundle and returns (manifest, df, tfidf, tfidf_matrix, store).
+    The CSR arrays and catalog columns are memory-mapped read-only by default,
+    so every worker process on the host shares the same physical pages.
+    `df` is column-projected: the long text columns stay in `store` and are
+    read by row id on demand.
+    """
+    manifest = read_manifest(bundle_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No index bundle in {bundle_dir}")
+
+    mmap_mode = "r" if mmap else None
+    with open(os.path.join(bundle_dir, "vocabulary.json"), encoding="utf-8") as f:
+        vocabulary = json.load(f)
+    idf = np.load(os.path.join(bundle_dir, "idf.npy"))
+
+    # A fixed vocabulary plus idf_ is the supported way to restore a fitted vectorizer
+    tfidf = TfidfVectorizer(vocabulary=vocabulary, **manifest.get("tfidf_params", TFIDF_PARAMS))
+    tfidf.idf_ = idf
+
+    data = np.load(os.path.join(bundle_dir, "tfidf_data.npy"), mmap_mode=mmap_mode)
+    indices = np.load(os.path.join(bundle_dir, "tfidf_indices.npy"), mmap_mode=mmap_mode)
+    indptr = np.load(os.path.join(bundle_dir, "tfidf_indptr.npy"), mmap_mode=mmap_mode)
+    tfidf_matrix = sp.csr_matrix((data, indices, indptr), shape=tuple(manifest["shape"]), copy=False)
+
+    store = catalog_store.CatalogStore(os.path.join(bundle_dir, "catalog"), mmap=mmap)
+    df = store.load_frame(exclude=catalog_store.LAZY_TEXT_COLUMNS)
+    return manifest, df, tfidf, tfidf_matrix, store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the precomputed TripGenix index bundle.")
+    parser.add_argument("command", choices=["build", "check"], help="build the bundle, or check whether it is fresh")
+    parser.add_argument("--data", default="tourism_data.csv")
+    parser.add_argument("--out", default=DEFAULT_BUNDLE_DIR)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the bundle is fresh")
+    args = parser.parse_args()
+
+    if args.command == "check":
+        fresh = is_bundle_fresh(args.out, args.data)
+        print(f"{args.out} is {'fresh' if fresh else 'stale or missing'}.")
+        raise SystemExit(0 if fresh else 1)
+
+    if not args.force and is_bundle_fresh(args.out, args.data):
+        print(f"{args.out} is already up to date with {args.data}.")
+    else:
+        build_bundle(args.data, args.out)
@@ -0,0 +1,273 @@
+import bisect
+import collections
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from sub-millisecond index work to slow upstreams
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    return repr(float(value)) if value != float("inf") else "+Inf"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self):
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def render(self):
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram; observe() is a bisect and three additions under a lock.
+    """
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        with self._lock:
+            values = {key: (list(entry[0]), entry[1], entry[2]) for key, entry in self._values.items()}
+        lines = []
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % _format_value(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [le])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    """
+    Holds the process's metrics and renders them in the Prometheus text format.
+    Collectors are callables run at scrape time that return
+    [(name, kind, documentation, [(labels dict, value), ...]), ...], for
+    numbers that already live elsewhere (e.g. cache hit counters).
+    Under the pre-fork server every worker has its own registry, so a scrape
+    sees the worker that answered it.
+    """
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def register_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = Histogram(
+    "tripgenix_stage_seconds", "Time spent in each stage of a serving path.", ["path", "stage"])
+HTTP_REQUEST_SECONDS = Histogram(
+    "tripgenix_http_request_seconds", "Flask request latency by endpoint.", ["endpoint", "method", "status"])
+UPSTREAM_SECONDS = Histogram(
+    "tripgenix_upstream_request_seconds", "Upstream API call latency by host and status.", ["host", "status"])
+UPSTREAM_RETRIES = Counter(
+    "tripgenix_upstream_retries_total", "Upstream API retries by host.", ["host"])
+ENGINE_LOAD_SECONDS = Gauge(
+    "tripgenix_engine_load_seconds", "Time the last RecommendationEngine took to load or compact.", ["phase"])
+CATALOG_ROWS = Gauge(
+    "tripgenix_catalog_rows", "Rows in the serving catalog, including tombstoned ones.")
+
+
+@contextmanager
+def stage(path, name):
+    """
+    Times one stage of a serving path into tripgenix_stage_seconds.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, path=path, stage=name)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that can be switched on and off in a running server.
+    A background thread snapshots every other thread's stack each `interval`
+    seconds (sys._current_frames) and counts the collapsed stacks, so its cost
+    is fixed by the interval rather than by the code being profiled.
+    report() returns the folded-stack format flame graph tools read.
+    """
+    def __init__(self, interval=0.01, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._stacks = collections.Counter()
+        self._samples = 0
+        self._lock = threading.Lock()
+        self._stop = None
+        self._thread = None
+        self.started_at = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self, interval=None):
+        with self._lock:
+            if self._thread is not None:
+                return False
+            if interval:
+                self.interval = interval
+            self._stacks.clear()
+            self._samples = 0
+            self.started_at = time.time()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop,),
+                                            name="tripgenix-profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        with self._lock:
+            if self._thread is None:
+                return False
+            self._stop.set()
+            thread, self._thread = self._thread, None
+        thread.join()
+        return True
+
+    def _run(self, stop):
+        own = threading.get_ident()
+        while not stop.wait(self.interval):
+            frames = sys._current_frames()
+            sampled = []
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                sampled.append(";".join(reversed(stack)))
+            with self._lock:
+                self._stacks.update(sampled)
+                self._samples += 1
+
+    def report(self, limit=None):
+        with self._lock:
+            stacks = self._stacks.most_common(limit)
+        return "\n".join(f"{stack} {count}" for stack, count in stacks) + "\n"
+
+    def status(self):
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "interval": self.interval,
+                "samples": self._samples,
+                "stacks": len(self._stacks),
+                "started_at": self.started_at,
+            }
+
+
+PROFILER = SamplingProfiler()
+
+
+def render():
+    return REGISTRY.render()
@@ -1,176 +1,787 @@
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.neighbors import NearestNeighbors
 import os
 import numpy as np
 import random
-from api_manager import TripGenixAPIManager
+import copy
+import functools
+import threading
+import time
+import re
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+import scipy.sparse as sp
+from api_manager import TripGenixAPIManager, EnrichmentQueue, reset_default_http_client
+import index_bundle
+import catalog_store
+import retrieval
+import ranking
+import metrics
+import geo_index
+import search_index
+import trip_planner
+
+# Hotel suggestions per budget for generated itineraries
+ITINERARY_HOTELS = {
+    "Low": ["Zostel", "Local Guesthouse", "Backpacker Hostel"],
+    "Medium": ["Ginger Hotel", "Treebo Trend", "Standard Boutique Hotel"],
+    "High": ["Taj Resorts", "The Oberoi", "Luxury Villa"]
+}
+# Longest trip, in days, that itineraries, ranking and plans accept; also
+# bounds what one memoized itinerary can hold
+MAX_TRIP_DAYS = 30
+# Bound on memoized (row, days) itineraries per engine
+ITINERARY_CACHE_SIZE = int(os.environ.get('TRIPGENIX_ITINERARY_CACHE', 4096))
+# Bound on cached retrieval results (see QueryResultCache)
+RESULT_CACHE_SIZE = int(os.environ.get('TRIPGENIX_RESULT_CACHE_SIZE', 4096))
+
+# Same tokens TfidfVectorizer's default token_pattern extracts
+_QUERY_TOKEN = re.compile(r"(?u)\b\w\w+\b")
+
+class _ReadWriteLock:
+    """
+    Many concurrent readers or one writer. Readers never wait on each other;
+    writers (catalog edits and compaction swaps) hold it only for the brief
+    moment they publish new structures. A waiting writer holds back new
+    readers so it cannot be starved; reads are reentrant per thread.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self):
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0:
+            with self._cond:
+                while self._writer or self._writers_waiting:
+                    self._cond.wait()
+                self._readers += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                with self._cond:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._readers or self._writer:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+def _reads_catalog(method):
+    """
+    Runs an engine method under the catalog read lock, so it never observes a
+    half-applied edit or compaction swap.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._rw_lock.read():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class QueryResultCache:
+    """
+    Bounded LRU of retrieval results (candidate row ids + similarities), keyed
+    by a canonical form of the query. Entries are stamped with the catalog
+    version, so any edit or rebuild turns older entries into misses.
+    Only the over-fetched pool is cached; re-ranking (which depends on days)
+    and result shaping run per request.
+    """
+    def __init__(self, max_items=RESULT_CACHE_SIZE):
+        self.max_items = max_items
+        self._entries = OrderedDict()  # key -> (version, rows, scores)
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def canonical(state, district, budget, interests, category):
+        """
+        Trimmed, case-folded filters with 'All' as empty, and the interest
+        tokens sorted (order never changes a TF-IDF vector).
+        """
+        def value(text):
+            text = str(text or '').strip().casefold()
+            return '' if text == 'all' else text
+        tokens = sorted(_QUERY_TOKEN.findall(str(interests or '').casefold()))
+        return value(state), value(district), value(budget), ' '.join(tokens), value(category)
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return entry[1], entry[2]
+            if entry is not None:
+                del self._entries[key]
+            self.counters["misses"] += 1
+        return None
+
+    def set(self, key, version, rows, scores):
+        with self._lock:
+            self._entries[key] = (version, rows, scores)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["items"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
 
 class RecommendationEngine:
     """
     TripGenix Recommendation Engine (KNN Powered)
     Uses TF-IDF Vectorization and K-Nearest Neighbors to find similar destinations.
     """
-    def __init__(self, data_path="tourism_data.csv"):
+    def __init__(self, data_path="tourism_data.csv", bundle_dir=index_bundle.DEFAULT_BUNDLE_DIR, backend=None,
+                 ranker=None):
+        started = time.perf_counter()
         # Ensure data exists; if not, generate it (which also enriches it)
-        if not os.path.exists(data_path):
+        if not os.path.exists(data_path) and not (bundle_dir and index_bundle.read_manifest(bundle_dir)):
             import data_generator
             data_generator.generate_data()
-            
-        self.df = pd.read_csv(data_path)
-        
-        # Ensure Combined_Features exists (backward compatibility or regeneration)
-        if 'Combined_Features' not in self.df.columns:
-            # Fallback creation if for some reason csv is old
-            self.df['Combined_Features'] = (
-                self.df['Category'].fillna('') + " " + 
-                self.df['Activities'].fillna('') + " " + 
-                self.df['Budget'].fillna('') + " " + 
-                self.df['State'].fillna('')
-            )
 
+        # Prefer the precomputed bundle (see index_bundle.py); it is rebuilt only
+        # when the source CSV hash changes, otherwise loading is just mmap.
+        # The bundle's df is column-projected: long text stays in catalog_store
+        self.manifest = None
+        self.catalog_store = None
+        if bundle_dir:
+            try:
+                if not index_bundle.is_bundle_fresh(bundle_dir, data_path):
+                    index_bundle.build_bundle(data_path, bundle_dir)
+                (self.manifest, self.df, self.tfidf, self.tfidf_matrix,
+                 self.catalog_store) = index_bundle.load_bundle(bundle_dir)
+            except (OSError, ValueError) as e:
+                print(f"Index bundle unavailable ({e}), fitting in memory.")
+                self.manifest = None
+
+        if self.manifest is None:
+            self.df = index_bundle.load_catalog(data_path)
+            self.tfidf, self.tfidf_matrix = index_bundle.fit_tfidf(self.df)
+            self.catalog_version = index_bundle.file_sha256(data_path)[:12]
+            self.catalog_modified = os.path.getmtime(data_path)
+            self.catalog_columns = list(self.df.columns)
+            # Row -> catalog store row; -1 means the record holds its own text
+            self._store_rows = [-1] * len(self.df)
+        else:
+            self.catalog_version = self.manifest["source_sha256"][:12]
+            self.catalog_modified = self.manifest["built_at"]
+            self.catalog_columns = self.catalog_store.columns
+            self._store_rows = list(range(len(self.df)))
+        self._lazy_columns = [column for column in catalog_store.LAZY_TEXT_COLUMNS
+                              if column in self.catalog_columns and column not in self.df.columns]
+        self.load_seconds = {"catalog": time.perf_counter() - started}
+
+        self.backend = backend
+        # Second-stage ranking over the retrieved pool (see ranking.py)
+        self.ranker = ranker or ranking.HybridRanker.from_env()
+        self.result_cache = QueryResultCache()
+        # Multi-stop routing over recommended places (see plan_trip)
+        self.planner = trip_planner.TripPlanner()
+        phase_started = time.perf_counter()
         self._initialize_ml()
+        self.load_seconds["backend"] = time.perf_counter() - phase_started
+        phase_started = time.perf_counter()
+        self._build_serving_indexes()
+        self.load_seconds["indexes"] = time.perf_counter() - phase_started
+        self.api_manager = TripGenixAPIManager()
+        # Background enrichment for non-blocking place pages
+        self.enrichment = EnrichmentQueue(self.api_manager)
+
+        # Runtime catalog edits (see upsert_destination / compact)
+        self._rw_lock = _ReadWriteLock()
+        self._mutation_lock = threading.Lock()
+        self._base_version = self.catalog_version
+        self._revision = 0
+        self._changes_since_compaction = 0
+        self._compaction_stop = None
+        # Set by warm_up(); the readiness endpoint reports it
+        self.ready = False
+
+        self.load_seconds["total"] = time.perf_counter() - started
+        for phase, seconds in self.load_seconds.items():
+            metrics.ENGINE_LOAD_SECONDS.set(seconds, phase=phase)
+        metrics.CATALOG_ROWS.set(len(self._records))
+
+    def warm_up(self):
+        """
+        Runs one query through every serving path, so the lazily built pieces
+        (backend internals, itinerary cache, memory-mapped bundle pages) are
+        loaded before traffic arrives. Called in the pre-fork master, the pages
+        touched here are shared by every worker. Returns the time taken.
+        """
+        started = time.time()
+        states = self.get_all_states()
+        self.get_recommendations(states[0] if states else '', '', '', 'nature', days=3)
+        self.get_recommendations_batch([{"interests": "heritage"}])
+        if states:
+            for item in self.get_destinations_by_state_page(states[0], per_page=1)['items']:
+                self._lookup_place(item['Place'])
+        self.ready = True
+        self.load_seconds["warm_up"] = time.time() - started
+        metrics.ENGINE_LOAD_SECONDS.set(self.load_seconds["warm_up"], phase="warm_up")
+        return self.load_seconds["warm_up"]
+
+    def after_fork(self):
+        """
+        Call in each worker after a pre-fork server forks it. The model arrays
+        stay shared copy-on-write; only process-local resources are rebuilt:
+        locks (possibly held by a master thread at fork time), the SQLite cache
+        connection and the HTTP connection pool. Background threads do not
+        survive a fork, so compaction has to be started again per worker.
+        """
+        self._rw_lock = _ReadWriteLock()
+        self._mutation_lock = threading.Lock()
+        self._compaction_stop = None
+        reset_default_http_client()
         self.api_manager = TripGenixAPIManager()
+        self.enrichment = EnrichmentQueue(self.api_manager)
 
     def _initialize_ml(self):
         """
-        Train the KNN Model:
-        1. Vectorize 'Combined_Features' using TF-IDF.
-        2. Fit NearestNeighbors model on the vectors.
+        Fit the retrieval backend on the TF-IDF vectors ('Combined_Features',
+        already vectorized from the bundle or the in-memory fit).
+        Brute-force KNN is the exact reference; 'ann' (see retrieval.py) trades a
+        little recall for sub-linear search on large catalogs.
         """
-        self.tfidf = TfidfVectorizer(stop_words='english')
-        self.tfidf_matrix = self.tfidf.fit_transform(self.df['Combined_Features'].fillna(''))
-        
-        # KNN Model
-        # Metric: cosine distance (1 - cosine similarity)
-        # Algorithm: brute is good for smaller datasets, auto works generally
-        self.knn = NearestNeighbors(n_neighbors=10, metric='cosine', algorithm='brute')
-        self.knn.fit(self.tfidf_matrix)
+        if self.backend is None:
+            self.backend = retrieval.make_backend()
+        self.backend.fit(self.tfidf_matrix)
 
-    def get_recommendations(self, state, district, budget, interests, days=3):
+    def _build_serving_indexes(self):
+        # Plain-Python row views, so results skip per-row pandas overhead
+        self._records = self.df.to_dict('records')
+        self._build_attribute_indexes()
+        self._build_lookup_indexes()
+        self._build_itinerary_flags()
+        # Rating / Price_Day / Duration_Suitability as float arrays for the ranker
+        self._rank_features = ranking.build_features(self.df)
+        # BallTree over the stored coordinates (placeholder 0/0 rows left out)
+        self._geo_index = geo_index.GeoIndex.from_frame(self.df)
+        # Prefix + trigram autocomplete over Place/District/State
+        self._search_index = search_index.SearchIndex.from_frame(self.df)
+        # Sorted ids of rows not tombstoned; None while nothing has been deleted
+        self._live_rows = None
+
+    @_reads_catalog
+    def get_recommendations(self, state, district, budget, interests, days=3, category='', top_k=5):
         """
         KNN-based recommendation:
         1. Create a query vector from user inputs.
-        2. Find K-nearest neighbors.
-        3. Rank and filter results.
+        2. Restrict the candidate rows with the attribute indexes (hard filters).
+        3. Retrieve an over-fetched pool of nearest neighbours among those rows.
+           Steps 1-3 are skipped when the canonical query is in the result cache.
+        4. Re-rank the pool with the hybrid ranker (similarity, rating, budget
+           and duration fit) and shape the top-k results.
+        `days` is clamped to [1, MAX_TRIP_DAYS].
         """
-        
-        # 1. Construct User Query
-        # "Beach Relaxing Low Kerala"
-        query_text = f"{interests} {budget} {state if state != 'All' else ''} {district if district != 'All' else ''}"
-        query_vec = self.tfidf.transform([query_text])
-        
-        # 2. Find Neighbors
-        # Returns distances and indices of the nearest neighbors
-        # We ask for more than we need (e.g., 20) to allow for post-filtering
-        n_neighbors = min(20, len(self.df))
-        distances, indices = self.knn.kneighbors(query_vec, n_neighbors=n_neighbors)
-        
-        # 3. Process Results
-        candidates = self.df.iloc[indices[0]].copy()
-        candidates['distance'] = distances[0]
-        # Convert distance to similarity score (1 - distance) for display
-        candidates['score'] = 1 - candidates['distance']
-        
-        # 4. Apply Hard/Soft Filters
-        # Even though KNN finds "similar" items, we might want to strictly enforce budget if user desires.
-        # However, prompts say "Recommendation", so maybe just rank them.
-        # Let's strictly filter budget if provided, as that's a hard constraint for many.
-        if budget:
-             candidates = candidates[candidates['Budget'].str.lower() == budget.lower()]
-             
-        # If no candidates left after filtering, revert to top KNN results (soft filter fallback)
-        if candidates.empty:
-            candidates = self.df.iloc[indices[0]].copy()
-            candidates['distance'] = distances[0]
-            candidates['score'] = 1 - candidates['distance']
-
-        # 5. Select Top Results
-        top_results = candidates.head(5).to_dict('records')
-        
-        # 6. Enrich Layout
+        days = self._trip_days(days)
+        indices, scores = self._ranked_rows(state, district, budget, interests, days, category, top_k)
+
+        # 5. Enrich Layout (itineraries are timed separately inside)
+        with metrics.stage("recommend", "format"):
+            return [self._format_result(i, score, days) for i, score in zip(indices, scores)]
+
+    def _ranked_rows(self, state, district, budget, interests, days, category, top_k, path="recommend"):
+        """
+        Steps 1-4 of get_recommendations: the re-ranked top-k as (row ids, scores).
+        """
+        with metrics.stage(path, "query_build"):
+            state, district, budget, interests, category = QueryResultCache.canonical(
+                state, district, budget, interests, category)
+            pool = top_k * self.ranker.overfetch
+            key = (state, district, budget, interests, category, pool)
+            cached = self.result_cache.get(key, self.catalog_version)
+
+        if cached is not None:
+            indices, scores = cached
+        else:
+            # 1. Construct User Query
+            # "Beach Relaxing Low Kerala"
+            query_text = self._build_query_text(state, district, budget, interests)
+            with metrics.stage(path, "transform"):
+                query_vec = self.tfidf.transform([query_text])
+
+            # 2. Apply Hard Filters before ranking, so the top-k is taken over matching
+            # rows only (no more "Low" requests falling back to "High" places)
+            with metrics.stage(path, "filter"):
+                rows = self._filter_rows(state, district, budget, category)
+
+            # 3. Find Neighbors (cosine similarity) through the retrieval backend
+            with metrics.stage(path, "search"):
+                if rows is not None and len(rows) == 0:
+                    indices, scores = np.empty(0, dtype=np.int64), np.empty(0)
+                else:
+                    indices, scores = self.backend.search(query_vec, pool, rows=rows)
+            self.result_cache.set(key, self.catalog_version, indices, scores)
+
+        # 4. Re-rank; days only matter from here on, so they never split the cache
+        with metrics.stage(path, "rerank"):
+            return self.ranker.rerank(indices, scores, self._rank_features,
+                                      self.ranker.budget_price(budget), days, top_k)
+
+    # Queries are scored in blocks so the dense (queries x catalog) score matrix
+    # stays around this many cells regardless of batch or catalog size
+    SCORE_BLOCK_CELLS = 4_000_000
+
+    @_reads_catalog
+    def get_recommendations_batch(self, queries, top_k=5):
+        """
+        Vectorized multi-query variant of get_recommendations:
+        1. Transform all query texts with one tfidf.transform call.
+        2. Score them with a single sparse product against the L2-normalized
+           TF-IDF matrix (dot product == cosine similarity).
+        3. Mask out rows failing each query's filters and pick an over-fetched
+           pool per row with argpartition.
+        4. Re-rank every pool at once with the hybrid ranker and keep the top-k.
+        `queries` is a list of dicts with state/district/budget/category/interests/days keys.
+        Returns one result list per query, in input order.
+        """
+        if not queries:
+            return []
+
+        texts = [
+            self._build_query_text(q.get('state', ''), q.get('district', ''), q.get('budget', ''), q.get('interests', ''))
+            for q in queries
+        ]
+        query_matrix = self.tfidf.transform(texts)
+        catalog_t = self.tfidf_matrix.T.tocsc()
+        n_rows = self.tfidf_matrix.shape[0]
+        top_k = min(top_k, n_rows)
+        if top_k <= 0:
+            return [[] for _ in queries]
+        pool = min(top_k * self.ranker.overfetch, n_rows)
+        budget_prices = np.array([self.ranker.budget_price(q.get('budget', '')) for q in queries])
+        query_days = [self._trip_days(q.get('days', 3)) for q in queries]
+        days = np.array(query_days, dtype=float)
+        block = max(1, self.SCORE_BLOCK_CELLS // max(n_rows, 1))
+
         results = []
-        for res in top_results:
-            # We already have data in CSV, but let's ensure structure matches frontend expectations
-            
-            # Dynamic re-enrichment (optional, but good for freshness if cache expired)
-            # Since data_generator already did it, we primarily trust csv, 
-            # but we can call api_manager if fields are missing.
-            
-            # Generate Itinerary
-            itinerary = self._generate_itinerary(res, int(days))
-            
-            result_item = {
-                "name": res['Place'],
-                "score": round(res['score'], 2),
-                "category": res['Category'],
-                "budget": res['Budget'],
-                "map": res.get('Map_Link', ''),
-                "images": [res['Image']] if pd.notna(res['Image']) else [],
-                "about": res.get('Description', ''),
-                "Tags": res.get('Activities', ''), # Mapping Activities to Tags for frontend pill display
-                "Price_Day": res.get('Price_Day', 3000),
-                "Review": res.get('Review', 'A great place to visit!'),
-                "Rating": res.get('Rating', 4.5),
-                "Itinerary": itinerary,
-                
-                # Compatibility with legacy frontend fields just in case
-                "Place": res['Place'],
-                "Description": res.get('Description', ''),
-                "Image": res.get('Image', '')
-            }
-            results.append(result_item)
-            
+        for start in range(0, len(queries), block):
+            batch = queries[start:start + block]
+            scores = (query_matrix[start:start + block] @ catalog_t).toarray()
+            for row, query in enumerate(batch):
+                rows = self._filter_rows(query.get('state', ''), query.get('district', ''),
+                                         query.get('budget', ''), query.get('category', ''))
+                if rows is not None:
+                    masked = np.full(n_rows, -np.inf)
+                    masked[rows] = scores[row, rows]
+                    scores[row] = masked
+
+            # Unordered pool per row, re-ranked in one pass; then sort only the top-k
+            top = np.argpartition(-scores, pool - 1, axis=1)[:, :pool]
+            similarity = np.take_along_axis(scores, top, axis=1)
+            blended = self.ranker.score(top, np.where(np.isfinite(similarity), similarity, 0.0),
+                                        self._rank_features, budget_prices[start:start + block, None],
+                                        days[start:start + block, None])
+            top_scores = np.where(np.isfinite(similarity), blended, -np.inf)
+            order = np.argsort(-top_scores, axis=1, kind='stable')[:, :top_k]
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            for row, query in enumerate(batch):
+                valid = np.isfinite(top_scores[row])
+                results.append([
+                    self._format_result(i, score, query_days[start + row])
+                    for i, score in zip(top[row][valid], top_scores[row][valid])
+                ])
         return results
 
+    # Columns with inverted indexes; each maps normalized value -> sorted row ids
+    FILTER_COLUMNS = ['State', 'District', 'Budget', 'Category']
+
+    def _build_attribute_indexes(self):
+        self._attribute_index = {}
+        for column in self.FILTER_COLUMNS:
+            values = self.df[column].astype(object).fillna('').astype(str).str.strip().str.lower()
+            self._attribute_index[column] = {
+                value: np.asarray(positions, dtype=np.int64)
+                for value, positions in values.groupby(values).indices.items() if value
+            }
+
+    def _build_lookup_indexes(self):
+        """
+        Normalized place -> row (first match wins, as the old scan did) and the
+        sorted state list, so detail and listing pages are a dict lookup.
+        _place_rows keeps every row per name for catalog edits.
+        """
+        places = self.df['Place'].astype(object).fillna('').astype(str).str.strip().str.lower()
+        self._place_rows = {
+            place: np.asarray(positions, dtype=np.int64)
+            for place, positions in places.groupby(places).indices.items()
+        }
+        self._place_index = {place: int(rows[0]) for place, rows in self._place_rows.items()}
+        self._states = sorted(self.df['State'].dropna().unique().tolist())
+
+    @staticmethod
+    def _normalize_key(value):
+        return (value or '').strip().lower()
+
+    def _filter_rows(self, state='', district='', budget='', category=''):
+        """
+        Intersects the posting lists of every active filter ('' and 'All' mean no filter).
+        Returns None when nothing is filtered (and nothing is tombstoned),
+        otherwise a sorted array of live row ids.
+        """
+        rows = None
+        for column, value in (('State', state), ('District', district), ('Budget', budget), ('Category', category)):
+            value = self._normalize_key(value)
+            if not value or value == 'all':
+                continue
+            postings = self._attribute_index[column].get(value, np.empty(0, dtype=np.int64))
+            rows = postings if rows is None else np.intersect1d(rows, postings, assume_unique=True)
+        # Postings never contain tombstoned rows, so only the unfiltered case needs the live set
+        return self._live_rows if rows is None else rows
+
+    def _build_query_text(self, state, district, budget, interests):
+        return f"{interests} {budget} {state if state != 'All' else ''} {district if district != 'All' else ''}"
+
+    def _format_result(self, row, score, days):
+        """
+        Shapes a catalog row into the structure the frontend expects.
+        """
+        res = self._full_record(row)
+        # We already have data in CSV, but let's ensure structure matches frontend expectations
+
+        # Dynamic re-enrichment (optional, but good for freshness if cache expired)
+        # Since data_generator already did it, we primarily trust csv,
+        # but we can call api_manager if fields are missing.
+
+        # Generate Itinerary
+        with metrics.stage("recommend", "itinerary"):
+            itinerary = self._itinerary_for_row(row, days)
+
+        return {
+            "name": res['Place'],
+            "score": round(float(score), 2),
+            "category": res['Category'],
+            "budget": res['Budget'],
+            "map": res.get('Map_Link', ''),
+            "images": [res['Image']] if pd.notna(res['Image']) else [],
+            "about": res.get('Description', ''),
+            "Tags": res.get('Activities', ''), # Mapping Activities to Tags for frontend pill display
+            "Price_Day": res.get('Price_Day', 3000),
+            "Review": res.get('Review', 'A great place to visit!'),
+            "Rating": res.get('Rating', 4.5),
+            "Itinerary": itinerary,
+
+            # Compatibility with legacy frontend fields just in case
+            "Place": res['Place'],
+            "Description": res.get('Description', ''),
+            "Image": res.get('Image', '')
+        }
+
+    @_reads_catalog
     def get_all_states(self):
-        return sorted(self.df['State'].unique().tolist())
+        return list(self._states)
 
+    @_reads_catalog
     def get_destinations_by_state(self, state_name):
-        results = self.df[self.df['State'].str.lower() == state_name.lower()].copy()
-        top_results = results.to_dict('records')
-        
-        final_results = []
-        for res in top_results:
-             itinerary = self._generate_itinerary(res, 3)
-             res['Itinerary'] = itinerary
-             res['name'] = res['Place'] # map for frontend
-             res['about'] = res.get('Description', '')
-             if 'Image' in res and pd.notna(res['Image']):
-                 res['images'] = [res['Image']]
-             res['map'] = res.get('Map_Link', '')
-             res['Tags'] = res.get('Activities', '')
-             final_results.append(res)
-             
-        return final_results
+        return list(self._iter_state_items(self._state_rows(state_name)))
+
+    @_reads_catalog
+    def get_destinations_by_state_page(self, state_name, page=1, per_page=24):
+        """
+        Page-number variant of get_destinations_by_state. `items` is a lazy
+        generator: itineraries are only built for rows on the requested page,
+        and a template can stream them as they are produced.
+        """
+        rows = self._state_rows(state_name)
+        per_page = max(1, int(per_page))
+        pages = max(1, -(-len(rows) // per_page))
+        page = min(max(1, int(page)), pages)
+        page_rows = rows[(page - 1) * per_page:page * per_page]
+        return {
+            "items": self._iter_state_items(page_rows),
+            "page": page,
+            "per_page": per_page,
+            "pages": pages,
+            "total": len(rows),
+        }
+
+    @_reads_catalog
+    def get_destinations_by_state_after(self, state_name, cursor=None, limit=50):
+        """
+        Cursor variant for API clients. The cursor is the last row id returned,
+        so it stays valid while rows are appended, until the next compaction.
+        Returns a lazy `items` generator and `next_cursor` (None on the last page).
+        """
+        rows = self._state_rows(state_name)
+        limit = max(1, int(limit))
+        start = 0 if cursor is None else int(np.searchsorted(rows, int(cursor), side='right'))
+        page_rows = rows[start:start + limit]
+        has_more = start + limit < len(rows)
+        return {
+            "items": self._iter_state_items(page_rows),
+            "next_cursor": str(int(page_rows[-1])) if has_more else None,
+            "total": len(rows),
+        }
+
+    def _state_rows(self, state_name):
+        return self._attribute_index['State'].get(self._normalize_key(state_name), np.empty(0, dtype=np.int64))
+
+    def _iter_state_items(self, rows):
+        # Bind the current structures now: the generator runs after the read lock
+        # is released, and a compaction may have renumbered rows by then.
+        # The itinerary memo reads its own snapshot of records and themes
+        records, store_rows, itineraries = self._records, self._store_rows, self._itinerary_cache
+
+        def generate():
+            for row in rows:
+                 res = dict(self._full_record(row, records, store_rows))
+                 res['Itinerary'] = itineraries(int(row), 3)
+                 res['name'] = res['Place'] # map for frontend
+                 res['about'] = res.get('Description', '')
+                 if 'Image' in res and pd.notna(res['Image']):
+                     res['images'] = [res['Image']]
+                 res['map'] = res.get('Map_Link', '')
+                 res['Tags'] = res.get('Activities', '')
+                 yield res
+        return generate()
 
     def get_place_details(self, place_name):
         """
         Retrieves full details for a specific place, including multiple images and hotels.
         """
-        # Find place in dataframe
-        place_data = self.df[self.df['Place'].str.lower() == place_name.lower()]
+        # Find place via the normalized name index
+        res = self._lookup_place(place_name)
         
-        if place_data.empty:
+        if res is None:
             return None
-            
-        res = place_data.iloc[0].to_dict()
-        
-        # Enrichment (Live) to get all images
-        enriched = self.api_manager.enrich_place(res['Place'])
         
+        # Enrichment (Live) to get all images; upstream calls run in parallel
+        # and hotels use the stored coordinates (no geocoding round trip)
+        enriched = self.api_manager.enrich_place_concurrent(res['Place'], include_hotels=True,
+                                                            location=self._stored_location(res))
+        return self._merge_enrichment(res, enriched)
+
+    @_reads_catalog
+    def search(self, query, limit=10):
+        """
+        Autocomplete over place, district and state names, best first.
+        Each hit has name, kind ("place" / "district" / "state"), score and
+        context (state, district, destinations). Deleted places are skipped.
+        """
+        hits = []
+        # Ask for a few extra in case some places were deleted since the last compaction
+        for hit in self._search_index.search(query, limit + 5):
+            if hit['kind'] == 'place':
+                if self._normalize_key(hit['name']) not in self._place_index:
+                    continue
+                hit.pop('row', None)
+            hits.append(hit)
+            if len(hits) == limit:
+                break
+        return hits
+
+    @staticmethod
+    def _stored_location(record):
+        """
+        The catalog's coordinates as an enrichment location, or None for the 0/0 placeholder.
+        """
+        lat, lon = record.get('Latitude'), record.get('Longitude')
+        if not geo_index.valid_coordinates(lat, lon):
+            return None
+        return {"lat": float(lat), "lon": float(lon)}
+
+    # Upper bounds for nearby searches
+    MAX_NEARBY_RESULTS = 100
+    MAX_NEARBY_RADIUS_KM = 2000
+
+    @_reads_catalog
+    def get_nearby(self, place_name=None, lat=None, lon=None, radius_km=None, k=None):
+        """
+        Destinations near a catalog place or a coordinate pair, closest first,
+        from the local spatial index.
+        - k: at most k results (default 10 without a radius, MAX_NEARBY_RESULTS
+          with one; never more than MAX_NEARBY_RESULTS)
+        - radius_km: only results within this great-circle distance
+        Returns None for an unknown place; raises ValueError for unusable input.
+        The origin place itself is never included.
+        """
+        origin_row = None
+        if place_name:
+            origin_row = self._place_index.get(self._normalize_key(place_name))
+            if origin_row is None:
+                return None
+            record = self._records[origin_row]
+            lat, lon = record.get('Latitude'), record.get('Longitude')
+            if not geo_index.valid_coordinates(lat, lon):
+                raise ValueError(f"No stored coordinates for {record['Place']}")
+        elif not geo_index.valid_coordinates(lat, lon):
+            raise ValueError("Give a place or valid lat/lon")
+
+        if k is None:
+            k = 10 if radius_km is None else self.MAX_NEARBY_RESULTS
+        k = max(1, min(int(k), self.MAX_NEARBY_RESULTS))
+        if radius_km is not None:
+            radius_km = float(radius_km)
+            if not 0 < radius_km <= self.MAX_NEARBY_RADIUS_KM:
+                raise ValueError(f"radius_km must be in (0, {self.MAX_NEARBY_RADIUS_KM}]")
+
+        # Over-fetch by the rows a k-query could lose: the origin and tombstones
+        dead = 0 if self._live_rows is None else len(self._records) - len(self._live_rows)
+        fetch = k + 1 + dead
+        rows, distances = self._geo_index.query(float(lat), float(lon), k=fetch, radius_km=radius_km)
+        keep = rows != (-1 if origin_row is None else origin_row)
+        if self._live_rows is not None:
+            keep &= np.isin(rows, self._live_rows)
+        rows, distances = rows[keep], distances[keep]
+        rows, distances = rows[:k], distances[:k]
+
+        results = []
+        for row, distance in zip(rows, distances):
+            record = self._records[row]
+            results.append({
+                "name": record['Place'],
+                "state": record.get('State'),
+                "district": record.get('District'),
+                "category": record.get('Category'),
+                "budget": record.get('Budget'),
+                "rating": record.get('Rating'),
+                "Price_Day": record.get('Price_Day'),
+                "image": record.get('Image') if pd.notna(record.get('Image')) else None,
+                "lat": float(record['Latitude']),
+                "lon": float(record['Longitude']),
+                "distance_km": round(float(distance), 2),
+            })
+        return {
+            "origin": {"name": self._records[origin_row]['Place'] if origin_row is not None else None,
+                       "lat": float(lat), "lon": float(lon)},
+            "results": results,
+        }
+
+    # Upper bound on candidates routed by a trip plan
+    MAX_PLAN_CANDIDATES = 50
+
+    @_reads_catalog
+    def plan_trip(self, state, district, budget, interests, days=3, max_price_day=None, category='',
+                  candidates=30):
+        """
+        Multi-destination trip plan:
+        1. Take the top `candidates` recommendations for the query (same
+           retrieval, cache and re-ranking as get_recommendations).
+        2. Route the ones under `max_price_day` with stored coordinates and
+           split the route into at most `days` days (see trip_planner.TripPlanner).
+        Raises ValueError for unusable input.
+        """
+        days = int(days)
+        if not 1 <= days <= MAX_TRIP_DAYS:
+            raise ValueError(f"days must be in [1, {MAX_TRIP_DAYS}]")
+        candidates = max(1, min(int(candidates), self.MAX_PLAN_CANDIDATES))
+        if max_price_day is not None:
+            max_price_day = float(max_price_day)
+            if max_price_day <= 0:
+                raise ValueError("max_price_day must be positive")
+
+        indices, scores = self._ranked_rows(state, district, budget, interests, days, category, candidates,
+                                            path="plan")
+        with metrics.stage("plan", "candidates"):
+            stops = []
+            for row, score in zip(indices, scores):
+                record = self._records[row]
+                location = self._stored_location(record) or {"lat": None, "lon": None}
+                price = record.get('Price_Day')
+                stops.append({
+                    "name": record['Place'],
+                    "state": record.get('State'),
+                    "district": record.get('District'),
+                    "category": record.get('Category'),
+                    "budget": record.get('Budget'),
+                    "rating": record.get('Rating'),
+                    "Price_Day": float(price) if pd.notna(price) else None,
+                    "image": record.get('Image') if pd.notna(record.get('Image')) else None,
+                    "score": round(float(score), 2),
+                    **location,
+                })
+        with metrics.stage("plan", "route"):
+            return self.planner.plan(stops, days, max_price_day)
+
+    def get_place_summary(self, place_name):
+        """
+        Details from the catalog alone, for pages that must not wait on upstream
+        APIs. Images, hotels and the Wikipedia extract follow from
+        get_place_enrichment.
+        """
+        res = self._lookup_place(place_name)
+        if res is None:
+            return None
+        res['images'] = [res['Image']] if pd.notna(res.get('Image')) else []
+        res['Hotels'] = []
+        res['about'] = res.get('Description')
+        res['map'] = res.get('Map_Link')
+        return res
+
+    def get_place_enrichment(self, place_name, wait=0):
+        """
+        Enrichment for a place page, served by the background queue
+        (stale-while-revalidate, one upstream fetch per place at a time).
+        Returns None for an unknown place, {"status": "pending"} while the first
+        fetch runs, otherwise status plus images/hotels/about/map.
+        """
+        res = self._lookup_place(place_name)
+        if res is None:
+            return None
+        enriched, status = self.enrichment.get(res['Place'], wait=wait, location=self._stored_location(res))
+        if enriched is None:
+            return {"status": status}
+        merged = self._merge_enrichment(res, enriched)
+        return {
+            "status": status,
+            "images": merged['images'],
+            "hotels": merged['Hotels'],
+            "about": merged['about'],
+            "map": merged['map'],
+        }
+
+    def _merge_enrichment(self, res, enriched):
+        """
+        Merges an enrich_place result into a catalog record, with the catalog
+        and mock hotels as fallbacks. Parts the enrichment only filled with
+        its own defaults (see "fallbacks") never replace catalog values.
+        """
+        fallbacks = set(enriched.get('fallbacks', [])) if enriched else set()
         # Merge enrichment
-        res['images'] = enriched.get('images', []) if enriched else []
+        res['images'] = enriched.get('images', []) if enriched and 'images' not in fallbacks else []
         if not res['images'] and pd.notna(res.get('Image')):
              res['images'] = [res['Image']]
+        if not res['images'] and enriched:
+             res['images'] = enriched.get('images', [])
         
-        # Hotels: Fetch Real Data via OSM (Nominatim)
-        real_hotels = self.api_manager.get_hotels(res['Place'])
+        # Hotels: Real Data via OSM (Nominatim), fetched alongside the enrichment
+        real_hotels = enriched.get('hotels', []) if enriched else []
         
         if real_hotels:
             # Sort by Rating (Desc) and Price (Asc)
-            # Tuple sort: (-rating, price)
-            real_hotels.sort(key=lambda x: (-x['rating'], x['price']))
+            # Tuple sort: (-rating, price); sorted() leaves cached lists untouched
+            real_hotels = sorted(real_hotels, key=lambda x: (-x['rating'], x['price']))
             res['Hotels'] = real_hotels[:5] # Top 5
         else:
             # Fallback if OSM returns nothing (mock)
@@ -185,44 +796,112 @@ class RecommendationEngine:
             res['Hotels'] = [{"name": n, "rating": 4.0, "price": 0, "address": "City Center"} for n in names]
         
         # Text fields
-        res['about'] = enriched.get('about') if enriched else res.get('Description')
+        res['about'] = enriched.get('about') if enriched and 'description' not in fallbacks else None
+        if not res['about'] or pd.isna(res['about']):
+            res['about'] = res.get('Description') if pd.notna(res.get('Description')) else (
+                enriched.get('about') if enriched else None)
         res['map'] = enriched.get('map') if enriched else res.get('Map_Link')
         
         return res
 
-    def _generate_itinerary(self, place_data, days):
+    @_reads_catalog
+    def _lookup_place(self, place_name):
+        row = self._place_index.get(self._normalize_key(place_name))
+        return None if row is None else dict(self._full_record(row))
+
+    # Lazily stored columns only the model uses; never fetched for display
+    MODEL_ONLY_COLUMNS = ('Combined_Features',)
+
+    def _full_record(self, row, records=None, store_rows=None, columns=None):
+        """
+        The row's record with the lazily stored text columns read from the
+        catalog store by row id: the displayed ones (Description, Review) by
+        default, or `columns`.
+        Returns the record itself when there is nothing to fetch.
+        """
+        records = self._records if records is None else records
+        store_rows = self._store_rows if store_rows is None else store_rows
+        record = records[row]
+        store_row = store_rows[row]
+        if store_row < 0 or self.catalog_store is None:
+            return record
+        if columns is None:
+            columns = [column for column in self._lazy_columns if column not in self.MODEL_ONLY_COLUMNS]
+        full = dict(record)
+        for column in columns:
+            full[column] = self.catalog_store.get_value(column, store_row)
+        return full
+
+    def _build_itinerary_flags(self):
+        """
+        Per-row itinerary theme ('beach', 'hill' or ''), computed once with vectorized
+        string ops instead of `in` checks on every call, plus the bounded memo.
+        """
+        tags = (self.df['Activities'].astype(object).fillna('').astype(str) + " " +
+                self.df['Category'].astype(object).fillna('').astype(str))
+        beach = tags.str.contains("Beach", regex=False)
+        hill = tags.str.contains("Hill Station", regex=False) | tags.str.contains("Mountain", regex=False)
+        self._row_theme = np.where(beach, "beach", np.where(hill, "hill", "")).tolist()
+        self._itinerary_cache = self._itinerary_memo(self._records, self._row_theme)
+
+    @staticmethod
+    def _trip_days(days):
+        """
+        Trip length as an int clamped to [1, MAX_TRIP_DAYS]; ValueError/TypeError
+        if it is not a number.
+        """
+        return max(1, min(int(days), MAX_TRIP_DAYS))
+
+    def _itinerary_for_row(self, row, days):
+        """
+        Memoized (row, days) itinerary. The returned list is shared between
+        callers, so treat it as read-only. Days are clamped, so one entry
+        never holds more than MAX_TRIP_DAYS days.
+        """
+        return self._itinerary_cache(int(row), self._trip_days(days))
+
+    def _itinerary_memo(self, records, themes):
+        """
+        Bounded (row, days) memo over the given record and theme lists rather
+        than the live attributes, so a holder of the memo keeps building
+        itineraries for the rows it was created with across edits and compactions.
+        """
+        def build(row, days):
+            return self._generate_itinerary(records[row], days, theme=themes[row])
+        return functools.lru_cache(maxsize=ITINERARY_CACHE_SIZE)(build)
+
+    def _generate_itinerary(self, place_data, days, theme=None):
         """
         Rule-based itinerary generation based on destination metadata.
+        Deterministic: the suggested hotel is seeded by the place name, so the
+        same request always yields the same plan and can be cached downstream.
         """
         itinerary = []
         name = place_data['Place']
-        tags = place_data.get('Activities', '') + " " + place_data.get('Category', '')
         budget = place_data.get('Budget', 'Medium')
-        
-        hotels = {
-            "Low": ["Zostel", "Local Guesthouse", "Backpacker Hostel"],
-            "Medium": ["Ginger Hotel", "Treebo Trend", "Standard Boutique Hotel"],
-            "High": ["Taj Resorts", "The Oberoi", "Luxury Villa"]
-        }
-        suggested_hotel = random.choice(hotels.get(budget, hotels["Medium"]))
+        if theme is None:
+            theme = self._itinerary_theme(place_data)
+
+        hotels = ITINERARY_HOTELS.get(budget, ITINERARY_HOTELS["Medium"])
+        suggested_hotel = hotels[zlib.crc32(str(name).encode("utf-8")) % len(hotels)]
 
         for day in range(1, days + 1):
             day_plan = {
                 "Day": day,
                 "Morning": f"Explore the scenic spots of {name}.",
                 "Afternoon": f"Enjoy local {budget}-friendly cuisine.",
-                "Evening": f"Relaxing evening walk.",
-                "Night": f"Dinner at a local favorite.",
+                "Evening": "Relaxing evening walk.",
+                "Night": "Dinner at a local favorite.",
                 "Hotel": suggested_hotel if day == 1 else "Same as Day 1",
             }
             
-            if "Beach" in tags:
+            if theme == "beach":
                 if day == 1:
                     day_plan["Morning"] = "Sunrise by the ocean."
                     day_plan["Afternoon"] = "Water sports or beach volley."
                 elif day == 2:
                      day_plan["Morning"] = "Visit nearby coastal villages."
-            elif "Hill Station" in tags or "Mountain" in tags:
+            elif theme == "hill":
                 if day == 1:
                     day_plan["Morning"] = "Trek to the highest viewpoint."
                     day_plan["Afternoon"] = "Visit tea/coffee plantations."
@@ -230,3 +909,255 @@ class RecommendationEngine:
             itinerary.append(day_plan)
             
         return itinerary
+
+    @staticmethod
+    def _itinerary_theme(place_data):
+        tags = f"{place_data.get('Activities', '')} {place_data.get('Category', '')}"
+        return "beach" if "Beach" in tags else "hill" if ("Hill Station" in tags or "Mountain" in tags) else ""
+
+    # ------------------------------------------------------------------
+    # Runtime catalog edits
+    # ------------------------------------------------------------------
+
+    # Standard price per day for each budget band, as in data_generator
+    BUDGET_PRICES = ranking.BUDGET_PRICES
+
+    # Destination fields converted to floats by _prepare_record
+    NUMERIC_COLUMNS = ('Rating', 'Price_Day', 'Latitude', 'Longitude')
+
+    def _prepare_record(self, destination):
+        """
+        Fills a destination dict out to the catalog schema, with the same
+        defaults data_generator uses.
+        """
+        place = str(destination.get('Place') or '').strip()
+        if not place:
+            raise ValueError("Destination needs a 'Place' name")
+
+        record = {column: np.nan for column in self.catalog_columns}
+        record.update(destination)
+        record['Place'] = place
+        # Checked up front: a bad value must fail before any index is touched
+        for column in self.NUMERIC_COLUMNS:
+            value = record.get(column)
+            if isinstance(value, str):
+                value = value.strip() or None
+            try:
+                record[column] = np.nan if value is None else float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"'{column}' must be a number")
+        for column, bound in (('Latitude', 90), ('Longitude', 180)):
+            if pd.notna(record.get(column)) and abs(record[column]) > bound:
+                raise ValueError(f"'{column}' must be within +/-{bound}")
+        for column in ('State', 'District', 'Category', 'Activities', 'Budget'):
+            value = record.get(column)
+            if isinstance(value, (list, dict)):
+                raise ValueError(f"'{column}' must be text")
+            record[column] = '' if value is None or pd.isna(value) else str(value).strip()
+        if pd.isna(record.get('Description')):
+            record['Description'] = f"Discover the beauty of {place}."
+        if pd.isna(record.get('Price_Day')):
+            record['Price_Day'] = self.BUDGET_PRICES.get(record['Budget'], self.BUDGET_PRICES['High'])
+        if pd.isna(record.get('Combined_Features')):
+            record['Combined_Features'] = (
+                f"{record['Category']} {record['Activities']} {record['Budget']} {record['State']} "
+                f"{record['Description']} {record.get('Review', '') if pd.notna(record.get('Review')) else ''}"
+            )
+        return record
+
+    def _bump_version(self):
+        # Caller holds the write lock. Page/result caches key on catalog_version
+        self._revision += 1
+        self._changes_since_compaction += 1
+        self.catalog_version = f"{self._base_version}.{self._revision}"
+        # Last-Modified for cached pages; only changes when the catalog does
+        self.catalog_modified = time.time()
+
+    def _without_rows(self, rows, live_rows, attribute_index):
+        """
+        Returns (live_rows, attribute_index) with `rows` removed from the live set
+        and every posting list. Works on copies, so callers can build the new
+        structures before taking the write lock; matrix rows stay in place until
+        the next compaction.
+        """
+        attribute_index = {column: dict(index) for column, index in attribute_index.items()}
+        if len(rows) == 0:
+            return live_rows, attribute_index
+        if live_rows is None:
+            live_rows = np.arange(len(self._records), dtype=np.int64)
+        live_rows = np.setdiff1d(live_rows, rows, assume_unique=True)
+        for column in self.FILTER_COLUMNS:
+            index = attribute_index[column]
+            for row in rows:
+                key = self._normalize_key(str(self._records[row][column] or ''))
+                if key in index:
+                    remaining = np.setdiff1d(index[key], [row], assume_unique=True)
+                    if len(remaining):
+                        index[key] = remaining
+                    else:
+                        del index[key]
+        return live_rows, attribute_index
+
+    @staticmethod
+    def _live_states(records, live_rows):
+        rows = range(len(records)) if live_rows is None else live_rows
+        return sorted({records[row]['State'] for row in rows
+                       if pd.notna(records[row]['State']) and records[row]['State'] != ''})
+
+    def upsert_destination(self, destination):
+        """
+        Adds a destination, or replaces every live row with the same Place name,
+        without refitting:
+        1. The row is vectorized with the existing vocabulary and IDF (words the
+           model has never seen are ignored until the next compaction).
+        2. It is appended to the TF-IDF matrix, the retrieval backend and the
+           lookup indexes.
+        3. Replaced rows are tombstoned.
+        Everything is built on copies first; the write lock only publishes it,
+        so a failed edit leaves the engine untouched.
+        Returns the new row id.
+        """
+        record = self._prepare_record(destination)
+        key = self._normalize_key(record['Place'])
+
+        with self._mutation_lock:
+            # Edits are serialized by the mutation lock, so the current
+            # structures can be read here while readers keep using them
+            row = len(self._records)
+            vector = self.tfidf.transform([record['Combined_Features']])
+            matrix = sp.vstack([self.tfidf_matrix, vector], format='csr')
+            backend = copy.copy(self.backend).add(matrix, np.array([row]))
+            theme = self._itinerary_theme(record)
+            rank_features = ranking.append_features(self._rank_features, record)
+            geo = copy.copy(self._geo_index)
+            geo.add(row, record.get('Latitude'), record.get('Longitude'))
+            search = self._search_index.copy()
+            search.add_place(row, record['Place'], record['State'], record['District'], record.get('Rating'))
+
+            old_rows = self._place_rows.get(key, np.empty(0, dtype=np.int64))
+            live_rows, attribute_index = self._without_rows(old_rows, self._live_rows, self._attribute_index)
+            if live_rows is not None:
+                live_rows = np.append(live_rows, row)
+            for column in self.FILTER_COLUMNS:
+                value = self._normalize_key(str(record[column] or ''))
+                if value:
+                    index = attribute_index[column]
+                    index[value] = np.append(index.get(value, np.empty(0, dtype=np.int64)), row)
+            records = self._records + [record]
+            row_theme = self._row_theme + [theme]
+            # The memo is bound to the record list, so it is replaced with it
+            itinerary_cache = self._itinerary_memo(records, row_theme)
+            states = self._live_states(records, live_rows)
+
+            with self._rw_lock.write():
+                self._records = records
+                self._store_rows = self._store_rows + [-1]
+                self._row_theme = row_theme
+                self._itinerary_cache = itinerary_cache
+                self._rank_features = rank_features
+                self._geo_index = geo
+                self._search_index = search
+                self.tfidf_matrix = matrix
+                self.backend = backend
+                self._live_rows = live_rows
+                self._attribute_index = attribute_index
+                self._place_rows[key] = np.array([row], dtype=np.int64)
+                self._place_index[key] = row
+                self._states = states
+                self._bump_version()
+        metrics.CATALOG_ROWS.set(row + 1)
+        return row
+
+    def delete_destination(self, place_name):
+        """
+        Tombstones every live row with this Place name.
+        Returns the number of rows removed.
+        """
+        key = self._normalize_key(place_name)
+        with self._mutation_lock:
+            rows = self._place_rows.get(key, np.empty(0, dtype=np.int64))
+            if len(rows) == 0:
+                return 0
+            live_rows, attribute_index = self._without_rows(rows, self._live_rows, self._attribute_index)
+            states = self._live_states(self._records, live_rows)
+
+            with self._rw_lock.write():
+                self._live_rows = live_rows
+                self._attribute_index = attribute_index
+                self._place_rows.pop(key, None)
+                self._place_index.pop(key, None)
+                self._states = states
+                self._bump_version()
+        return len(rows)
+
+    # Engine attributes replaced as one unit when a compaction is published
+    SERVING_ATTRIBUTES = (
+        'df', 'tfidf', 'tfidf_matrix', 'backend', '_records', '_attribute_index',
+        '_place_rows', '_place_index', '_states', '_row_theme', '_itinerary_cache', '_live_rows',
+        '_store_rows', '_rank_features', '_geo_index', '_search_index',
+    )
+
+    def compact(self):
+        """
+        Rebuilds the model from the live rows: refits vocabulary/IDF and the
+        backend, drops tombstones and renumbers rows. All the heavy work happens
+        off to the side; readers keep using the current model and are only held
+        for the attribute swap. Edits wait for the compaction to finish.
+        """
+        started = time.time()
+        with self._mutation_lock:
+            rows = range(len(self._records)) if self._live_rows is None else self._live_rows
+            records = [self._records[row] for row in rows]
+            # Store-backed rows keep their text on disk; only the fit reads it
+            texts = pd.Series([self._full_record(row, columns=self._lazy_columns)['Combined_Features'] for row in rows],
+                              dtype=object)
+
+            # Build a detached engine with the fresh structures
+            fresh = object.__new__(type(self))
+            fresh.df = pd.DataFrame(records)
+            for column in catalog_store.CATEGORICAL_COLUMNS:
+                if column in fresh.df.columns:
+                    fresh.df[column] = fresh.df[column].astype('category')
+            fresh.tfidf, fresh.tfidf_matrix = index_bundle.fit_tfidf_texts(texts.fillna(''))
+            fresh._store_rows = [self._store_rows[row] for row in rows]
+            fresh.backend = copy.copy(self.backend)
+            fresh._initialize_ml()
+            fresh._build_serving_indexes()
+
+            with self._rw_lock.write():
+                for name in self.SERVING_ATTRIBUTES:
+                    setattr(self, name, getattr(fresh, name))
+                self._bump_version()
+                self._changes_since_compaction = 0
+
+        metrics.ENGINE_LOAD_SECONDS.set(time.time() - started, phase="compact")
+        metrics.CATALOG_ROWS.set(len(records))
+        print(f"Catalog compacted in {time.time() - started:.2f}s: {len(records)} live rows.")
+        return len(records)
+
+    def start_background_compaction(self, interval=300, min_changes=1):
+        """
+        Compacts every `interval` seconds when at least `min_changes` edits have
+        accumulated. Returns the thread; stop_background_compaction() ends it.
+        """
+        if self._compaction_stop is not None:
+            return None
+        self._compaction_stop = threading.Event()
+        stop = self._compaction_stop
+
+        def loop():
+            while not stop.wait(interval):
+                if self._changes_since_compaction >= min_changes:
+                    try:
+                        self.compact()
+                    except Exception as e:
+                        print(f"Background compaction failed: {e}")
+
+        thread = threading.Thread(target=loop, name="tripgenix-compaction", daemon=True)
+        thread.start()
+        return thread
+
+    def stop_background_compaction(self):
+        if self._compaction_stop is not None:
+            self._compaction_stop.set()
+            self._compaction_stop = None
@@ -1,32 +1,111 @@
 import pandas as pd
 import os
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
 
-def preprocess_data(input_file="tourism_data.csv", output_file="preprocessed_tourism_data.csv"):
+# Text fields combined into 'Content' for content-based filtering, in order.
+# Each entry lists the accepted source columns; the first one present is used.
+CONTENT_SOURCES = [
+    ("Tags", ["Tags", "Activities"]),   # tourism_data.csv has Activities, not Tags
+    ("Description", ["Description"]),
+    ("Region", ["Region"]),             # Optional: not produced by data_generator
+    ("State", ["State"]),
+    ("District", ["District"]),
+]
+REQUIRED_FIELDS = {"Description", "State", "District"}
+
+
+def resolve_schema(columns):
+    """
+    Maps each content field to the input column that supplies it (None if absent).
+    Returns (mapping, missing required fields).
+    """
+    mapping = {}
+    for field, candidates in CONTENT_SOURCES:
+        mapping[field] = next((c for c in candidates if c in columns), None)
+    missing = sorted(field for field in REQUIRED_FIELDS if mapping[field] is None)
+    return mapping, missing
+
+
+def process_chunk(chunk, mapping):
+    """
+    Feature engineering for one chunk, using vectorized string ops only.
+    """
+    # Fill missing values
+    chunk = chunk.fillna('')
+
+    # Feature Engineering: Combine text fields for TF-IDF
+    # We combine Tags, Description, Region, State, and District for comprehensive metadata
+    parts = [chunk[column].astype(str) for column in mapping.values() if column is not None]
+    content = reduce(lambda left, right: left + " " + right, parts)
+
+    # Normalize text (optional, but good practice)
+    chunk['Content'] = content.str.lower()
+    return chunk
+
+
+def preprocess_data(input_file="tourism_data.csv", output_file="preprocessed_tourism_data.csv",
+                    chunksize=50000, workers=1):
     """
     Loads raw tourism data and applies feature engineering.
     Combines relevant text features for content-based filtering.
+    Streams the input in `chunksize` rows so memory stays bounded regardless of
+    file size; with workers > 1 chunks are processed on a process pool (in
+    order, with at most 2 * workers chunks in flight). Output is written
+    incrementally and swapped in atomically.
     """
     if not os.path.exists(input_file):
         print(f"Error: {input_file} not found. Run data_generator.py first.")
         return False
 
-    # Load the dataset
-    df = pd.read_csv(input_file)
+    # Validate the schema up front from the header alone
+    columns = pd.read_csv(input_file, nrows=0).columns
+    mapping, missing = resolve_schema(columns)
+    if missing:
+        print(f"Error: {input_file} is missing required columns: {', '.join(missing)}.")
+        return False
 
-    # Fill missing values
-    df = df.fillna('')
+    tmp_file = output_file + ".tmp"
+    rows = 0
+    first = True
 
-    # Feature Engineering: Combine text fields for TF-IDF
-    # We combine Tags, Description, Region, State, and District for comprehensive metadata
-    df['Content'] = df['Tags'] + " " + df['Description'] + " " + df['Region'] + " " + df['State'] + " " + df['District']
-    
-    # Normalize text (optional, but good practice)
-    df['Content'] = df['Content'].str.lower()
+    def write(chunk):
+        nonlocal rows, first
+        chunk.to_csv(tmp_file, mode='w' if first else 'a', header=first, index=False)
+        first = False
+        rows += len(chunk)
+
+    reader = pd.read_csv(input_file, chunksize=chunksize)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for chunk in reader:
+                pending.append(executor.submit(process_chunk, chunk, mapping))
+                if len(pending) >= 2 * workers:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+    else:
+        for chunk in reader:
+            write(process_chunk(chunk, mapping))
+
+    if first:
+        # Empty input: still produce a file with the header
+        pd.DataFrame(columns=list(columns) + ['Content']).to_csv(tmp_file, index=False)
 
     # Save the preprocessed data
-    df.to_csv(output_file, index=False)
-    print(f"Data preprocessing complete. Saved to {output_file}.")
+    os.replace(tmp_file, output_file)
+    print(f"Data preprocessing complete. Saved {rows} rows to {output_file}.")
     return True
 
+
 if __name__ == "__main__":
-    preprocess_data()
+    parser = argparse.ArgumentParser(description="Build the Content feature for content-based filtering.")
+    parser.add_argument("--input", default="tourism_data.csv")
+    parser.add_argument("--output", default="preprocessed_tourism_data.csv")
+    parser.add_argument("--chunksize", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    preprocess_data(args.input, args.output, chunksize=args.chunksize, workers=args.workers)
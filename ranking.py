@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import os
+
+# Standard price per day for each budget band, as in data_generator
+BUDGET_PRICES = {"Low": 2500, "Medium": 5500, "High": 12000}
+
+# "1 day", "1-2 days", "3 days" -> (min days, max days)
+DURATION_PATTERN = r'(\d+)(?:\s*-\s*(\d+))?'
+
+
+def build_features(df):
+    """
+    Numeric ranking features for every row, as float arrays aligned with row ids.
+    Missing values are NaN and score as neutral.
+    """
+    durations = df['Duration_Suitability'].astype(object).fillna('').astype(str).str.extract(DURATION_PATTERN)
+    min_days = pd.to_numeric(durations[0], errors='coerce').to_numpy(dtype=float)
+    max_days = pd.to_numeric(durations[1], errors='coerce').to_numpy(dtype=float)
+    max_days = np.where(np.isnan(max_days), min_days, max_days)
+    return {
+        "rating": pd.to_numeric(df['Rating'], errors='coerce').to_numpy(dtype=float),
+        "price": pd.to_numeric(df['Price_Day'], errors='coerce').to_numpy(dtype=float),
+        "min_days": min_days,
+        "max_days": max_days,
+    }
+
+
+def append_features(features, record):
+    """
+    Returns a copy of `features` with one row for `record` appended.
+    """
+    row = build_features(pd.DataFrame([record], columns=['Rating', 'Price_Day', 'Duration_Suitability']))
+    return {name: np.concatenate([features[name], row[name]]) for name in features}
+
+
+class HybridRanker:
+    """
+    Second-stage ranker over the retrieved candidate pool. One vectorized pass
+    blends four signals in [0, 1]:
+    - similarity: cosine similarity from retrieval
+    - rating: Rating / 5
+    - price: how close Price_Day is to the requested budget band (log-ratio decay)
+    - duration: whether the trip length falls inside Duration_Suitability
+      (1 inside the range, 1 / (1 + days outside) otherwise)
+    Unknown inputs (no budget, missing rating, ...) score a neutral 1.0 or 0.5.
+    Retrieval over-fetches `overfetch` times the requested k so the blend has
+    room to reorder. All inputs may carry a leading batch dimension.
+    """
+    DEFAULT_WEIGHTS = {"similarity": 0.7, "rating": 0.1, "price": 0.1, "duration": 0.1}
+
+    def __init__(self, weights=None, overfetch=10):
+        self.weights = dict(self.DEFAULT_WEIGHTS)
+        if weights:
+            unknown = set(weights) - set(self.DEFAULT_WEIGHTS)
+            if unknown:
+                raise ValueError(f"Unknown ranking weights: {sorted(unknown)}")
+            self.weights.update(weights)
+        self.overfetch = max(1, int(overfetch))
+
+    @classmethod
+    def from_env(cls):
+        """
+        TRIPGENIX_RANK_WEIGHTS="similarity=0.6,rating=0.2" and TRIPGENIX_RANK_OVERFETCH=10.
+        """
+        weights = {}
+        for pair in filter(None, os.environ.get('TRIPGENIX_RANK_WEIGHTS', '').split(',')):
+            name, _, value = pair.partition('=')
+            weights[name.strip()] = float(value)
+        return cls(weights, overfetch=int(os.environ.get('TRIPGENIX_RANK_OVERFETCH', 10)))
+
+    @staticmethod
+    def budget_price(budget):
+        return float(BUDGET_PRICES.get((budget or '').strip().capitalize(), np.nan))
+
+    def score(self, rows, similarity, features, budget_price, days):
+        """
+        Blended scores for candidate `rows` with their `similarity`.
+        `budget_price` and `days` are scalars, or arrays broadcastable against
+        `rows` (e.g. shape (n_queries, 1)); NaN means "no preference".
+        """
+        budget_price = np.asarray(budget_price, dtype=float)
+        days = np.asarray(days, dtype=float)
+
+        rating = features["rating"][rows]
+        rating_fit = np.where(np.isnan(rating), 0.5, np.clip(rating / 5.0, 0.0, 1.0))
+
+        price = np.maximum(features["price"][rows], 1.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            price_fit = np.exp(-np.abs(np.log(price / budget_price)))
+        price_fit = np.where(np.isnan(price_fit), 1.0, price_fit)
+
+        gap = np.maximum(np.maximum(features["min_days"][rows] - days, days - features["max_days"][rows]), 0.0)
+        duration_fit = np.where(np.isnan(gap), 1.0, 1.0 / (1.0 + gap))
+
+        w = self.weights
+        return (w["similarity"] * similarity + w["rating"] * rating_fit +
+                w["price"] * price_fit + w["duration"] * duration_fit)
+
+    def rerank(self, rows, similarity, features, budget_price, days, k):
+        """
+        Re-orders one query's candidates by blended score and keeps the best k.
+        Returns (row ids, blended scores), best first.
+        """
+        if len(rows) == 0:
+            return rows, similarity
+        blended = self.score(rows, similarity, features, budget_price, days)
+        order = np.argsort(-blended, kind='stable')[:k]
+        return rows[order], blended[order]
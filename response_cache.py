@@ -0,0 +1,139 @@
+from flask import request, make_response
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+import hashlib
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    Bounded, TTL-evicting cache of rendered HTML pages, keyed by route and arguments.
+    1. Entries are stamped with the catalog version; a rebuilt catalog makes
+       every older entry a miss without an explicit flush.
+    2. Responses carry a strong ETag (catalog version + body hash) and the
+       catalog's Last-Modified time (from `modified_func`, so it is the same
+       across TTL refreshes and workers), and answer conditional requests with 304.
+    3. invalidate() drops everything, or only keys under a path prefix.
+    """
+    def __init__(self, version_func, max_items=512, ttl=300, modified_func=None):
+        self.version_func = version_func
+        self.modified_func = modified_func
+        self.max_items = max_items
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> entry dict
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "not_modified": 0, "invalidations": 0}
+
+    @staticmethod
+    def _key():
+        return request.path + "?" + "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+
+    def get(self, key):
+        version = self.version_func()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry["version"] == version and entry["expires_at"] > time.time():
+                    self._entries.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return entry
+                del self._entries[key]
+            self.counters["misses"] += 1
+        return None
+
+    def set(self, key, body, mimetype):
+        version = self.version_func()
+        now = time.time()
+        modified = self.modified_func() if self.modified_func else now
+        entry = {
+            "body": body,
+            "mimetype": mimetype,
+            "version": version,
+            "etag": f"{version}-{hashlib.sha1(body).hexdigest()[:16]}",
+            "last_modified": datetime.fromtimestamp(int(modified), tz=timezone.utc),
+            "expires_at": now + self.ttl,
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, prefix=None):
+        """
+        Drops cached pages whose path starts with `prefix` (all pages if None).
+        Returns the number of entries removed.
+        """
+        with self._lock:
+            if prefix is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                keys = [key for key in self._entries if key.startswith(prefix)]
+                for key in keys:
+                    del self._entries[key]
+                removed = len(keys)
+            self.counters["invalidations"] += 1
+        return removed
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["items"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _respond(self, entry):
+        response = make_response(entry["body"])
+        response.mimetype = entry["mimetype"]
+        response.set_etag(entry["etag"])
+        response.last_modified = entry["last_modified"]
+        response.cache_control.public = True
+        response.cache_control.max_age = self.ttl
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            with self._lock:
+                self.counters["not_modified"] += 1
+        return response
+
+    def _tee(self, key, response):
+        """
+        Passes a streamed response through to the client while buffering it.
+        The page is only cached once the whole stream has been sent.
+        """
+        source = response.response
+        mimetype = response.mimetype
+
+        def generate():
+            chunks = []
+            for chunk in source:
+                chunks.append(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+                yield chunk
+            self.set(key, b"".join(chunks), mimetype)
+
+        response.response = generate()
+        return response
+
+    def cached(self, view):
+        """
+        Decorator for GET views that render near-static pages.
+        Only 200 responses are stored; errors pass through uncached, and
+        streamed responses are cached after they finish streaming.
+        """
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = self._key()
+            entry = self.get(key)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if response.is_streamed:
+                    return self._tee(key, response)
+                entry = self.set(key, response.get_data(), response.mimetype)
+            return self._respond(entry)
+        return wrapper
@@ -0,0 +1,253 @@
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+from sklearn.decomposition import TruncatedSVD
+from sklearn.cluster import MiniBatchKMeans
+import argparse
+import os
+import time
+
+
+class BruteForceBackend:
+    """
+    Exact cosine retrieval (the reference backend).
+    Unfiltered queries use a brute-force NearestNeighbors scan; filtered queries
+    score only the allowed rows with a sparse dot product.
+    """
+    name = "brute"
+
+    def fit(self, tfidf_matrix):
+        self.tfidf_matrix = tfidf_matrix
+        # KNN Model
+        # Metric: cosine distance (1 - cosine similarity)
+        # Algorithm: brute is good for smaller datasets, auto works generally
+        self.knn = NearestNeighbors(n_neighbors=10, metric='cosine', algorithm='brute')
+        self.knn.fit(tfidf_matrix)
+        return self
+
+    def add(self, tfidf_matrix, new_rows):
+        """
+        Picks up rows appended to the matrix; brute force just re-points at it.
+        """
+        return self.fit(tfidf_matrix)
+
+    def search(self, query_vec, k, rows=None):
+        """
+        Returns (row ids, cosine similarities) of the k best rows, best first.
+        `rows` optionally restricts the search to a sorted array of row ids.
+        """
+        if rows is None:
+            n_neighbors = min(k, self.tfidf_matrix.shape[0])
+            if n_neighbors <= 0:
+                return np.empty(0, dtype=np.int64), np.empty(0)
+            distances, indices = self.knn.kneighbors(query_vec, n_neighbors=n_neighbors)
+            # Convert distance to similarity score (1 - distance)
+            return indices[0], 1 - distances[0]
+
+        # Rows are L2-normalized, so the dot product is the cosine similarity.
+        # Small subsets are sliced out; large ones (e.g. all live rows) are scored
+        # in place to avoid copying most of the matrix
+        if len(rows) * 4 < self.tfidf_matrix.shape[0]:
+            scores = (self.tfidf_matrix[rows] @ query_vec.T).toarray().ravel()
+        else:
+            scores = (self.tfidf_matrix @ query_vec.T).toarray().ravel()[rows]
+        order = top_k_order(scores, k)
+        return rows[order], scores[order]
+
+
+class SVDIVFBackend:
+    """
+    Approximate retrieval for large catalogs, CPU only and fully local:
+    1. TF-IDF is reduced with TruncatedSVD to dense, L2-normalized vectors.
+    2. The vectors are clustered with k-means into `n_lists` inverted lists (IVF).
+    3. A query probes its `n_probe` closest lists and scores only their members.
+       Filtered queries probe further until k allowed rows are found; filters
+       selective enough to leave only a few rows are scored exactly instead.
+    4. The best `k * rerank_factor` candidates are re-scored exactly on the sparse
+       TF-IDF vectors, so returned scores are true cosine similarities.
+    Recall/latency knobs: n_components, n_lists, n_probe, rerank_factor.
+    """
+    name = "ann"
+
+    def __init__(self, n_components=128, n_lists=None, n_probe=8, rerank_factor=4, random_state=42):
+        self.n_components = n_components
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.rerank_factor = rerank_factor
+        self.random_state = random_state
+
+    def fit(self, tfidf_matrix):
+        self.tfidf_matrix = tfidf_matrix
+        n_rows, n_features = tfidf_matrix.shape
+
+        n_components = max(1, min(self.n_components, n_features - 1, n_rows - 1))
+        self.svd = TruncatedSVD(n_components=n_components, random_state=self.random_state)
+        self.vectors = _normalize_rows(self.svd.fit_transform(tfidf_matrix).astype(np.float32))
+
+        n_lists = self.n_lists or int(np.sqrt(n_rows))
+        n_lists = max(1, min(n_lists, n_rows))
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=self.random_state, n_init=3,
+                                 batch_size=min(4096, n_rows))
+        assignments = kmeans.fit_predict(self.vectors)
+        self.centroids = _normalize_rows(kmeans.cluster_centers_.astype(np.float32))
+
+        # Inverted lists: cluster -> sorted row ids
+        order = np.argsort(assignments, kind='stable')
+        bounds = np.searchsorted(assignments[order], np.arange(n_lists + 1))
+        self.lists = [order[bounds[c]:bounds[c + 1]] for c in range(n_lists)]
+        return self
+
+    def add(self, tfidf_matrix, new_rows):
+        """
+        Adds appended rows without refitting: they are projected with the existing
+        SVD and appended to their closest inverted list. Quality drifts as the
+        catalog moves away from the fitted basis; a full fit (compaction) resets it.
+        """
+        vectors = _normalize_rows(self.svd.transform(tfidf_matrix[new_rows]).astype(np.float32))
+        assignments = np.argmax(vectors @ self.centroids.T, axis=1)
+        lists = list(self.lists)
+        for row, cluster in zip(new_rows, assignments):
+            lists[cluster] = np.append(lists[cluster], row)
+        self.tfidf_matrix = tfidf_matrix
+        self.vectors = np.vstack([self.vectors, vectors])
+        self.lists = lists
+        return self
+
+    def search(self, query_vec, k, rows=None):
+        if rows is not None and len(rows) <= k * self.rerank_factor * self.n_probe:
+            # A selective filter leaves fewer rows than a probe would score; score them all exactly
+            scores = (self.tfidf_matrix[rows] @ query_vec.T).toarray().ravel()
+            order = top_k_order(scores, k)
+            return np.asarray(rows)[order], scores[order]
+
+        query = _normalize_rows(self.svd.transform(query_vec).astype(np.float32))[0]
+        n_probe = min(self.n_probe, len(self.lists))
+        if rows is None:
+            probe = top_k_order(self.centroids @ query, n_probe)
+            candidates = np.concatenate([self.lists[c] for c in probe])
+        else:
+            # Filtered: keep probing lists, closest first, until the probe
+            # budget is spent and at least k allowed rows have been found
+            allowed = np.zeros(self.vectors.shape[0], dtype=bool)
+            allowed[rows] = True
+            found, count = [], 0
+            for probed, c in enumerate(np.argsort(-(self.centroids @ query), kind='stable')):
+                if probed >= n_probe and count >= k:
+                    break
+                members = self.lists[c][allowed[self.lists[c]]]
+                found.append(members)
+                count += len(members)
+            candidates = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        if len(candidates) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        # Approximate pass on the dense vectors
+        approx = self.vectors[candidates] @ query
+        shortlist = candidates[top_k_order(approx, k * self.rerank_factor)]
+
+        # Exact re-scoring of the shortlist
+        scores = (self.tfidf_matrix[shortlist] @ query_vec.T).toarray().ravel()
+        order = top_k_order(scores, k)
+        return shortlist[order], scores[order]
+
+
+BACKENDS = {
+    BruteForceBackend.name: BruteForceBackend,
+    SVDIVFBackend.name: SVDIVFBackend,
+}
+
+
+# Recall/latency knobs of the ANN backend that can be tuned per deployment
+ANN_ENV_PARAMS = {
+    "n_components": "TRIPGENIX_ANN_N_COMPONENTS",
+    "n_lists": "TRIPGENIX_ANN_N_LISTS",
+    "n_probe": "TRIPGENIX_ANN_N_PROBE",
+    "rerank_factor": "TRIPGENIX_ANN_RERANK_FACTOR",
+}
+
+
+def make_backend(name=None, **params):
+    """
+    Builds a retrieval backend by name ('brute' or 'ann').
+    Defaults to TRIPGENIX_RETRIEVAL, then brute force. For 'ann', knobs not
+    passed explicitly are read from TRIPGENIX_ANN_N_PROBE=16 etc. (ANN_ENV_PARAMS).
+    """
+    name = name or os.environ.get('TRIPGENIX_RETRIEVAL', BruteForceBackend.name)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown retrieval backend '{name}', expected one of {sorted(BACKENDS)}")
+    if name == SVDIVFBackend.name:
+        for param, variable in ANN_ENV_PARAMS.items():
+            if param not in params and os.environ.get(variable, '').strip():
+                params[param] = int(os.environ[variable])
+    return BACKENDS[name](**params)
+
+
+def top_k_order(scores, k):
+    """
+    Positions of the k highest scores, best first (argpartition + sort of k).
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+def _normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def recall_at_k(reference, candidate, query_matrix, k=10):
+    """
+    Mean fraction of the reference backend's top-k that the candidate backend
+    also returns, over every row of `query_matrix`. Also reports the mean
+    per-query latency of each backend.
+    """
+    recalls = []
+    latency = {"reference": 0.0, "candidate": 0.0}
+    for i in range(query_matrix.shape[0]):
+        query_vec = query_matrix[i]
+        started = time.perf_counter()
+        expected, _ = reference.search(query_vec, k)
+        latency["reference"] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        found, _ = candidate.search(query_vec, k)
+        latency["candidate"] += time.perf_counter() - started
+
+        if len(expected):
+            recalls.append(len(set(expected.tolist()) & set(found.tolist())) / len(expected))
+
+    n = max(query_matrix.shape[0], 1)
+    return {
+        "recall_at_k": float(np.mean(recalls)) if recalls else 1.0,
+        "k": k,
+        "queries": query_matrix.shape[0],
+        "reference_ms": round(1000 * latency["reference"] / n, 3),
+        "candidate_ms": round(1000 * latency["candidate"] / n, 3),
+    }
+
+
+if __name__ == "__main__":
+    import index_bundle
+
+    parser = argparse.ArgumentParser(description="Check ANN recall@k against brute force on the catalog.")
+    parser.add_argument("--data", default="tourism_data.csv")
+    parser.add_argument("--queries", type=int, default=200, help="Catalog rows sampled as queries")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--n-components", type=int, default=128)
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--n-probe", type=int, default=8)
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    args = parser.parse_args()
+
+    df = index_bundle.load_catalog(args.data)
+    tfidf, tfidf_matrix = index_bundle.fit_tfidf(df)
+    rng = np.random.default_rng(0)
+    sample = rng.choice(tfidf_matrix.shape[0], size=min(args.queries, tfidf_matrix.shape[0]), replace=False)
+
+    brute = BruteForceBackend().fit(tfidf_matrix)
+    ann = SVDIVFBackend(n_components=args.n_components, n_lists=args.n_lists,
+                        n_probe=args.n_probe, rerank_factor=args.rerank_factor).fit(tfidf_matrix)
+    print(recall_at_k(brute, ann, tfidf_matrix[sample], k=args.k))
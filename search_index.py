@@ -0,0 +1,231 @@
+import numpy as np
+import pandas as pd
+import bisect
+import copy
+import functools
+import re
+import unicodedata
+
+# Kinds of searchable names, with a small ranking bonus each
+KIND_BONUS = {"place": 0.05, "state": 0.04, "district": 0.03}
+# Prefix matches scanned per query and suffix list; bounds the cost of
+# one-letter queries
+MAX_PREFIX_SCAN = 256
+# Trigrams found in more than this share of names are skipped by fuzzy
+# search (unless every query trigram is that common); they match everything
+COMMON_GRAM_SHARE = 0.05
+# Minimum trigram similarity (Dice coefficient) for a fuzzy match
+MIN_FUZZY_SCORE = 0.3
+# Fuzzy candidates re-scored exactly, per requested result
+FUZZY_SHORTLIST_FACTOR = 5
+SEARCH_CACHE_SIZE = 4096
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text):
+    """
+    Case-folded, accent-stripped, with runs of punctuation/space collapsed to one space.
+    """
+    text = unicodedata.normalize("NFKD", str(text or "")).casefold()
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    Autocomplete over Place, District and State names.
+    1. Prefix index: a sorted list of every word-start suffix of every name
+       ("red fort" is stored as "red fort" and "fort"), searched with bisect.
+       States and districts have their own list, so thousands of place names
+       sharing a short prefix cannot push them past the scan limit.
+    2. Trigram index: trigram -> ids of names containing it, for typo-tolerant
+       matches when prefixes do not fill the result list.
+    Results are ranked exact > name prefix > word prefix > fuzzy, then by kind
+    and popularity (rating for places, destination count otherwise), and are
+    memoized per query until the index changes.
+    """
+    def __init__(self):
+        self.labels = []      # entry id -> display name
+        self.kinds = []       # entry id -> "place" / "district" / "state"
+        self.keys = []        # entry id -> normalized name
+        self.extra = []       # entry id -> dict of fields returned with the hit
+        self.popularity = []  # entry id -> ranking weight in [0, 1]
+        self._entry_ids = {}  # (kind, key) -> entry id
+        self._suffixes = []          # place names
+        self._suffix_entries = []
+        self._region_suffixes = []   # state and district names
+        self._region_suffix_entries = []
+        self._grams = {}      # trigram -> entry ids
+        self._gram_sizes = np.empty(0, dtype=np.int64)  # entry id -> trigram count
+        self._search = functools.lru_cache(maxsize=SEARCH_CACHE_SIZE)(self._search_uncached)
+
+    @classmethod
+    def from_frame(cls, df):
+        index = cls()
+        places = df['Place'].astype(object).fillna('').astype(str)
+        states = df['State'].astype(object).fillna('').astype(str)
+        districts = df['District'].astype(object).fillna('').astype(str) if 'District' in df.columns else states
+        ratings = pd.to_numeric(df['Rating'], errors='coerce').fillna(0).to_numpy() if 'Rating' in df.columns \
+            else np.zeros(len(df))
+
+        for row, (place, state, district, rating) in enumerate(zip(places, states, districts, ratings)):
+            index._add_entry("place", place, {"row": row, "state": state, "district": district},
+                             min(float(rating) / 5.0, 1.0))
+        district_states = states.groupby(districts).first()
+        for kind, values in (("state", states), ("district", districts)):
+            counts = values[values.str.strip() != ''].value_counts()
+            top = counts.max() if len(counts) else 1
+            for name, count in counts.items():
+                extra = {"destinations": int(count)}
+                if kind == "district":
+                    extra["state"] = district_states[name]
+                index._add_entry(kind, name, extra, count / top)
+        index._finish()
+        return index
+
+    def _add_entry(self, kind, label, extra, popularity):
+        """
+        Registers a name; the first row wins for duplicate place names,
+        matching the engine's place lookup. Returns the entry id or None.
+        """
+        key = normalize(label)
+        if not key or (kind, key) in self._entry_ids:
+            return None
+        entry = len(self.labels)
+        self._entry_ids[(kind, key)] = entry
+        self.labels.append(str(label).strip())
+        self.kinds.append(kind)
+        self.keys.append(key)
+        self.extra.append(extra)
+        self.popularity.append(popularity)
+        return entry
+
+    def _word_suffixes(self, key):
+        return [key[i:] for i in range(len(key)) if i == 0 or key[i - 1] == " "]
+
+    def _suffix_lists(self, entry):
+        if self.kinds[entry] == "place":
+            return self._suffixes, self._suffix_entries
+        return self._region_suffixes, self._region_suffix_entries
+
+    def _finish(self):
+        pairs = sorted((suffix, entry) for entry, key in enumerate(self.keys) for suffix in self._word_suffixes(key))
+        for suffix, entry in pairs:
+            suffixes, entries = self._suffix_lists(entry)
+            suffixes.append(suffix)
+            entries.append(entry)
+        grams = {}
+        sizes = []
+        for entry, key in enumerate(self.keys):
+            key_grams = trigrams(key)
+            sizes.append(len(key_grams))
+            for gram in key_grams:
+                grams.setdefault(gram, []).append(entry)
+        self._grams = {gram: np.asarray(entries, dtype=np.int64) for gram, entries in grams.items()}
+        self._gram_sizes = np.asarray(sizes, dtype=np.int64)
+
+    def copy(self):
+        """
+        Independent copy for copy-on-write edits: containers that add_place
+        changes are duplicated, trigram postings are shared (add_place replaces
+        them rather than changing them), and memoized results start empty.
+        """
+        index = copy.copy(self)
+        for name in ('labels', 'kinds', 'keys', 'extra', 'popularity', '_suffixes', '_suffix_entries',
+                     '_region_suffixes', '_region_suffix_entries'):
+            setattr(index, name, list(getattr(self, name)))
+        index._entry_ids = dict(self._entry_ids)
+        index._grams = dict(self._grams)
+        index._search = functools.lru_cache(maxsize=SEARCH_CACHE_SIZE)(index._search_uncached)
+        return index
+
+    def add_place(self, row, place, state='', district='', rating=None):
+        """
+        Adds a place added at runtime (catalog upsert), and its district/state
+        if they are new. Memoized results are dropped.
+        """
+        rating = pd.to_numeric(rating, errors='coerce') if rating is not None else np.nan
+        popularity = min(float(rating) / 5.0, 1.0) if pd.notna(rating) else 0.0
+        added = [self._add_entry("place", place, {"row": row, "state": state, "district": district}, popularity)]
+        added.append(self._add_entry("state", state, {"destinations": 1}, 0.0))
+        added.append(self._add_entry("district", district, {"destinations": 1, "state": state}, 0.0))
+        for entry in filter(lambda e: e is not None, added):
+            suffixes, entries = self._suffix_lists(entry)
+            for suffix in self._word_suffixes(self.keys[entry]):
+                position = bisect.bisect_left(suffixes, suffix)
+                suffixes.insert(position, suffix)
+                entries.insert(position, entry)
+            key_grams = trigrams(self.keys[entry])
+            for gram in key_grams:
+                self._grams[gram] = np.append(self._grams.get(gram, np.empty(0, dtype=np.int64)), entry)
+            self._gram_sizes = np.append(self._gram_sizes, len(key_grams))
+        self._search.cache_clear()
+
+    def search(self, query, limit=10):
+        """
+        Ranked matches for `query` as a list of dicts with name, kind, score and
+        the entry's extra fields (row, state, district, destinations).
+        """
+        key = normalize(query)
+        if not key:
+            return []
+        return [dict(hit) for hit in self._search(key, limit)]
+
+    def _search_uncached(self, key, limit):
+        scores = {}
+
+        # 1. Prefix matches, from the sorted place and state/district suffix lists
+        for suffixes, suffix_entries in ((self._suffixes, self._suffix_entries),
+                                         (self._region_suffixes, self._region_suffix_entries)):
+            start = bisect.bisect_left(suffixes, key)
+            end = min(bisect.bisect_right(suffixes, key + "\uffff"), start + MAX_PREFIX_SCAN)
+            for position in range(start, end):
+                entry = suffix_entries[position]
+                name = self.keys[entry]
+                if name == key:
+                    score = 3.0
+                elif name.startswith(key):
+                    score = 2.0 + len(key) / len(name)
+                else:
+                    score = 1.5 + len(key) / len(name)
+                if score > scores.get(entry, 0.0):
+                    scores[entry] = score
+
+        # 2. Fuzzy matches by trigram overlap, only if prefixes fell short
+        if len(scores) < limit and self.keys:
+            query_grams = trigrams(key)
+            postings = [self._grams[gram] for gram in query_grams if gram in self._grams]
+            common = len(self.keys) * COMMON_GRAM_SHARE
+            selective = [p for p in postings if len(p) <= common] or postings
+            if selective:
+                # Shared-trigram counts for every name in one bincount pass
+                shared = np.bincount(np.concatenate(selective), minlength=len(self.keys))
+                entries = np.flatnonzero(shared)
+                # Estimated Dice coefficient; skipped common grams are assumed
+                # to match in the same proportion as the selective ones
+                dice = (2 * shared[entries] * (len(postings) / len(selective))
+                        / (len(query_grams) + self._gram_sizes[entries]))
+                shortlist = FUZZY_SHORTLIST_FACTOR * limit
+                if len(entries) > shortlist:
+                    top = np.argpartition(-dice, shortlist - 1)[:shortlist]
+                    entries = entries[top]
+                # Exact Dice on the shortlist
+                for entry in entries.tolist():
+                    score = 2 * len(query_grams & trigrams(self.keys[entry])) / (
+                        len(query_grams) + self._gram_sizes[entry])
+                    if score >= MIN_FUZZY_SCORE and entry not in scores:
+                        scores[entry] = float(score)
+
+        ranked = sorted(scores.items(), key=lambda item: (
+            -(item[1] + KIND_BONUS[self.kinds[item[0]]] + 0.01 * self.popularity[item[0]]),
+            len(self.keys[item[0]]), self.keys[item[0]]))
+        return tuple(
+            {"name": self.labels[entry], "kind": self.kinds[entry], "score": round(score, 3), **self.extra[entry]}
+            for entry, score in ranked[:limit]
+        )
@@ -0,0 +1,70 @@
+import argparse
+import gc
+import multiprocessing
+import os
+from gunicorn.app.base import BaseApplication
+
+
+class TripGenixServer(BaseApplication):
+    """
+    Production entry point: a pre-fork gunicorn server around app.py.
+    1. The master imports app.py once (preload), which loads the index bundle
+       and warms the engine up.
+    2. gc.freeze() moves everything loaded so far out of the collector's reach,
+       so workers do not dirty the shared pages just by running a GC pass.
+    3. Workers are forked from the warm master and share the model copy-on-write;
+       the bundle's CSR arrays and catalog columns are memory-mapped, so those
+       pages are shared through the page cache even after a write.
+    4. post_fork() rebuilds the per-process pieces (locks, SQLite and HTTP
+       connections) and starts background compaction in each worker.
+    Runtime catalog edits and the page cache are per worker, so with more than
+    one worker app.py refuses those admin calls with a 409; change the catalog
+    by rebuilding the bundle and doing a rolling restart instead.
+    """
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # Tells app.py not to start threads in the master; see post_fork
+        os.environ['TRIPGENIX_PREFORK'] = '1'
+        # Lets app.py refuse admin changes that would only reach one worker
+        os.environ['TRIPGENIX_PREFORK_WORKERS'] = str(self.cfg.workers)
+        import app as tripgenix_app
+        gc.freeze()
+        return tripgenix_app.app
+
+
+def post_fork(server, worker):
+    import app as tripgenix_app
+    tripgenix_app.engine.after_fork()
+    tripgenix_app.start_background_tasks()
+
+
+def server_options(workers=None, threads=None, bind=None, timeout=None):
+    """
+    Gunicorn settings, from arguments or TRIPGENIX_WORKERS / TRIPGENIX_THREADS /
+    TRIPGENIX_BIND / TRIPGENIX_WORKER_TIMEOUT.
+    """
+    return {
+        "bind": bind or os.environ.get('TRIPGENIX_BIND', "0.0.0.0:10000"),
+        "workers": workers or int(os.environ.get('TRIPGENIX_WORKERS', multiprocessing.cpu_count())),
+        "threads": threads or int(os.environ.get('TRIPGENIX_THREADS', 1)),
+        "timeout": timeout or int(os.environ.get('TRIPGENIX_WORKER_TIMEOUT', 60)),
+        "preload_app": True,
+        "post_fork": post_fork,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve TripGenix with a pre-fork worker pool.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--threads", type=int, default=None, help="Threads per worker; use more than 1 if clients send ?wait= to the enrichment endpoint")
+    parser.add_argument("--bind", default=None, help="Address to listen on, e.g. 0.0.0.0:10000")
+    parser.add_argument("--timeout", type=int, default=None, help="Seconds before a silent worker is restarted")
+    args = parser.parse_args()
+    TripGenixServer(server_options(args.workers, args.threads, args.bind, args.timeout)).run()
@@ -0,0 +1,142 @@
+import numpy as np
+import os
+import time
+import geo_index
+
+
+def distance_matrix(lat, lon):
+    """
+    Pairwise great-circle distances in km, in one broadcast haversine pass.
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    return geo_index.haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+
+
+def nearest_neighbour_route(dist, start=0):
+    """
+    Open path visiting every node once, always moving to the closest unvisited node.
+    """
+    n = len(dist)
+    order = np.empty(n, dtype=np.int64)
+    visited = np.zeros(n, dtype=bool)
+    current = start
+    for step in range(n):
+        order[step] = current
+        visited[current] = True
+        if step < n - 1:
+            current = int(np.argmin(np.where(visited, np.inf, dist[current])))
+    return order
+
+
+def two_opt(order, dist, deadline):
+    """
+    Improves an open path (first stop fixed) by segment reversals until no
+    reversal shortens it or `deadline` (perf_counter time) passes. For each i
+    every candidate j is scored at once with numpy; the best one is applied.
+    Returns (order, passes, finished) where finished is False if the deadline
+    cut it short.
+    """
+    order = order.copy()
+    n = len(order)
+    passes = 0
+    while True:
+        passes += 1
+        improved = False
+        for i in range(n - 2):
+            if time.perf_counter() > deadline:
+                return order, passes, False
+            a, b = order[i], order[i + 1]
+            # Reverse order[i+1 .. j] for j in i+2 .. n-1; the last j has no successor
+            c = order[i + 2:]
+            following = order[i + 3:]
+            removed = dist[a, b] + np.append(dist[c[:-1], following], 0.0)
+            added = dist[a, c] + np.append(dist[b, following], 0.0)
+            gains = removed - added
+            best = int(np.argmax(gains))
+            if gains[best] > 1e-9:
+                j = i + 2 + best
+                order[i + 1:j + 1] = order[i + 1:j + 1][::-1].copy()
+                improved = True
+        if not improved:
+            return order, passes, True
+
+
+class TripPlanner:
+    """
+    Multi-stop, day-by-day trip planning over a ranked candidate set.
+    1. Candidates over the daily price limit or without coordinates are dropped;
+       the best-ranked ones that could fit in the trip are kept.
+    2. Stops are ordered with nearest-neighbour from the top-ranked stop, then
+       improved with 2-opt until converged or `time_cap` seconds have passed.
+    3. The route is cut into days: a day takes stops in route order while the
+       driving time (at `speed_kmh`) plus `hours_per_stop` per visit fits in
+       `hours_per_day`, up to `max_stops_per_day`. Stops that do not fit in
+       the trip are returned as unscheduled.
+    Work per plan is O(n^2) numpy on at most a few dozen stops and bounded by
+    the time cap, so it holds up under concurrent requests.
+    """
+    def __init__(self, time_cap=None, speed_kmh=40.0, hours_per_day=10.0, hours_per_stop=3.0,
+                 max_stops_per_day=3):
+        self.time_cap = time_cap if time_cap is not None else float(os.environ.get('TRIPGENIX_PLAN_TIME_CAP', 0.05))
+        self.speed_kmh = speed_kmh
+        self.hours_per_day = hours_per_day
+        self.hours_per_stop = hours_per_stop
+        self.max_stops_per_day = max_stops_per_day
+
+    def plan(self, stops, days, max_price_day=None):
+        """
+        `stops` are dicts with at least name, lat, lon and Price_Day, best-ranked
+        first. Returns the day-by-day plan as a dict.
+        """
+        started = time.perf_counter()
+        days = max(1, int(days))
+        usable, skipped = [], {"over_budget": 0, "no_coordinates": 0}
+        for stop in stops:
+            if max_price_day is not None and stop.get('Price_Day') is not None and stop['Price_Day'] > max_price_day:
+                skipped["over_budget"] += 1
+            elif not geo_index.valid_coordinates(stop.get('lat'), stop.get('lon')):
+                skipped["no_coordinates"] += 1
+            else:
+                usable.append(stop)
+        usable = usable[:days * self.max_stops_per_day]
+
+        plan = {"days": [], "total_km": 0.0, "est_cost": 0, "unscheduled": [], "skipped": skipped,
+                "candidates": len(stops), "optimized": True}
+        if not usable:
+            plan["planning_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            return plan
+
+        dist = distance_matrix([s['lat'] for s in usable], [s['lon'] for s in usable])
+        order = nearest_neighbour_route(dist, start=0)
+        if len(order) > 3:
+            order, passes, finished = two_opt(order, dist, started + self.time_cap)
+            plan["optimized"] = finished
+
+        day, previous = None, None
+        for index in order.tolist():
+            leg_km = float(dist[previous, index]) if previous is not None else 0.0
+            stop = dict(usable[index], travel_km=round(leg_km, 2))
+            needed = leg_km / self.speed_kmh + self.hours_per_stop
+            if day is None or len(day["stops"]) >= self.max_stops_per_day or \
+                    (day["stops"] and day["hours"] + needed > self.hours_per_day):
+                if len(plan["days"]) == days:
+                    plan["unscheduled"].append(stop['name'])
+                    continue
+                day = {"day": len(plan["days"]) + 1, "stops": [], "hours": 0.0, "travel_km": 0.0, "est_cost": 0}
+                plan["days"].append(day)
+            day["stops"].append(stop)
+            day["hours"] += needed
+            day["travel_km"] += leg_km
+            # One stay per day, at the priciest stop visited that day
+            day["est_cost"] = max(day["est_cost"], stop.get('Price_Day') or 0)
+            plan["total_km"] += leg_km
+            previous = index
+
+        for day in plan["days"]:
+            day["hours"] = round(day["hours"], 1)
+            day["travel_km"] = round(day["travel_km"], 2)
+        plan["total_km"] = round(plan["total_km"], 2)
+        plan["est_cost"] = sum(day["est_cost"] for day in plan["days"])
+        plan["planning_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return plan